@@ -3,51 +3,92 @@
 import sys
 import os
 import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
 import time
-from bs4 import BeautifulSoup
-from recipe_scrapers import scrape_me
+import threading
+import multiprocessing
+import argparse
+import gzip
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from recipe_scrapers import scrape_html
 from recipe_scrapers._exceptions import WebsiteNotImplementedError
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 from datetime import datetime
 from pathlib import Path
 
-# Add parent directory to path so we can import from recipe_epub_converter_v2
+# Add parent directory to path so we can share the converter's Qt-free parsing helpers
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from recipe_parser import decode_html, find_recipe_node, make_soup, parse_retry_after, select_first_texts
 
-# Set up logging
-log_dir = Path(__file__).parent / "logs"
-log_dir.mkdir(exist_ok=True)
-log_file = log_dir / f'recipe_extraction_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+log = logging.getLogger(__name__)
+
+def setup_logging(log_file: Path) -> None:
+    """Log to the console and to log_file (also called in each extraction worker process)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler(log_file, encoding='utf-8')
+        ]
+    )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(log_file, encoding='utf-8')
-    ]
-)
+# Regexes used on every page, compiled once
+URL_RE = re.compile(r'(?m)^(?:- \[.*?\]\()?(\bhttps?://[^\s\)]+)(?:\))?')
+STEP_SPLIT_RE = re.compile(r'\n+|\d+\.\s*|\d+\)\s*')
 
-log = logging.getLogger(__name__)
+# str.translate table that drops control characters from JSON-LD blocks
+CONTROL_CHARS_TABLE = dict.fromkeys([*range(0x20), 0x7F])
+
+# Only build <script> tags that can carry structured recipe data
+JSON_LD_STRAINER = SoupStrainer('script', attrs={'type': ['application/ld+json', 'application/json']})
+
+def brotli_available() -> bool:
+    """Check whether urllib3 can decode Brotli-compressed responses"""
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            continue
+    return False
 
 def get_parent_dir():
     """Get the parent directory path"""
     return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def get_urls():
+def parse_args(argv: Optional[List[str]] = None):
+    """Parse command line options (sys.argv unless argv is given)"""
+    parser = argparse.ArgumentParser(description="Test recipe extraction from websites")
+    parser.add_argument('urls', nargs='*', help="recipe URLs (defaults to recipe_links.md)")
+    parser.add_argument('--no-cache', action='store_true', help="always fetch and extract from scratch")
+    parser.add_argument('--cache-dir', type=Path, default=Path(__file__).parent / "cache",
+                        help="directory for cached pages and recipes")
+    parser.add_argument('--aggregate', action='store_true',
+                        help="also save all results as one indented JSON file")
+    parser.add_argument('--verbose', action='store_true',
+                        help="keep response headers and raw JSON-LD data in saved results")
+    return parser.parse_args(argv)
+
+def get_urls(cli_urls: List[str]):
     """Get URLs from command line or recipe_links.md in parent directory"""
-    if len(sys.argv) > 1:
-        return sys.argv[1:]
+    if cli_urls:
+        return cli_urls
     
     try:
         recipe_links_path = os.path.join(get_parent_dir(), 'recipe_links.md')
         with open(recipe_links_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            urls = re.findall(r'(?m)^(?:- \[.*?\]\()?(\bhttps?://[^\s\)]+)(?:\))?', content)
+            urls = URL_RE.findall(content)
             if urls:
                 return urls
     except Exception as e:
@@ -56,8 +97,230 @@ def get_urls():
     log.error("No URLs provided. Please pass URLs as arguments or add them to recipe_links.md")
     sys.exit(1)
 
+# Ingredient selectors
+INGREDIENT_SELECTORS = [
+    # WPRM Plugin
+    '.wprm-recipe-ingredient-group .wprm-recipe-ingredient',
+    '.wprm-recipe-ingredients-container li',
+    '.wprm-recipe-ingredients li',
+    '[id*="wprm-recipe-ingredient"]',
+
+    # Tasty Recipes Plugin
+    '.tasty-recipes-ingredients li',
+    '.tasty-recipe-ingredients li',
+    '.tasty-recipes-ingredient-item',
+
+    # Core WP Recipe Maker
+    '.wpurp-recipe-ingredients li',
+    '.wpurp-recipe-ingredient',
+
+    # Generic recipe plugins
+    '[class*="recipe-ingredients"] li',
+    '[class*="ingredients-list"] li',
+    '[class*="ingredient-item"]',
+
+    # Specific recipe sites/plugins
+    '.recipe-ingredients__item',  # Whisk Affair
+    '.recipe-ingredients__list-item',  # Food Fanatic
+    '.ingredients-list__item',  # Common recipe theme
+    '[class*="ERS-ingredients"] li',
+    '[class*="recipe-ingred_str"]',
+
+    # Schema.org standard
+    '[itemprop="recipeIngredient"]',
+    '[itemprop="ingredients"]',
+
+    # Common HTML patterns
+    '.ingredients li',
+    '.ingredient-list li',
+    'ul.ingredients li',
+    '[class*="ingredient"] li'
+]
+
+# Instruction selectors
+INSTRUCTION_SELECTORS = [
+    # WPRM Plugin
+    '.wprm-recipe-instruction-group .wprm-recipe-instruction',
+    '.wprm-recipe-instructions-container li',
+    '.wprm-recipe-instructions li',
+    '[id*="wprm-recipe-instruction"]',
+
+    # Tasty Recipes Plugin
+    '.tasty-recipes-instructions li',
+    '.tasty-recipe-instructions li',
+    '.tasty-recipes-instruction-item',
+
+    # Core WP Recipe Maker
+    '.wpurp-recipe-instructions li',
+    '.wpurp-recipe-instruction',
+
+    # Generic recipe plugins
+    '[class*="recipe-instructions"] li',
+    '[class*="recipe-steps"] li',
+    '[class*="recipe-directions"] li',
+
+    # Specific recipe sites/plugins
+    '.recipe-instructions__step',  # Whisk Affair
+    '.recipe-method__step',  # Food Fanatic
+    '.method-steps__item',  # Common recipe theme
+    '[class*="ERS-instructions"] li',
+    '[class*="recipe-method"] li',
+
+    # Schema.org standard
+    '[itemprop="recipeInstructions"]',
+    '.instructions li',
+    '.instruction-list li',
+    'ol.instructions li',
+    '[class*="instruction"] li',
+    '[class*="step"] li'
+]
+
+# Recipe card containers, used to narrow the selector search
+RECIPE_ROOT_SELECTORS = [
+    '.wprm-recipe-container',
+    '.tasty-recipes',
+    '.wpurp-container',
+    '[itemtype*="schema.org/Recipe"]',
+    '.recipe-card'
+]
+
+# Title selectors
+TITLE_SELECTORS = [
+    'h1.recipe-title',
+    'h1.entry-title',
+    'h1[class*="recipe"]',
+    'h1[class*="title"]',
+    '.wprm-recipe-name',  # WPRM specific
+    '.recipe-title',
+    'h1',
+    'title'
+]
+
+# Compile every selector once at import instead of on each select() call;
+# extraction worker processes get their own copy when they import this module
+INGREDIENT_MATCHERS = [soupsieve.compile(s) for s in INGREDIENT_SELECTORS]
+INSTRUCTION_MATCHERS = [soupsieve.compile(s) for s in INSTRUCTION_SELECTORS]
+RECIPE_ROOT_MATCHERS = [soupsieve.compile(s) for s in RECIPE_ROOT_SELECTORS]
+TITLE_MATCHERS = [soupsieve.compile(s) for s in TITLE_SELECTORS]
+INGREDIENT_UNION = soupsieve.compile(', '.join(INGREDIENT_SELECTORS))
+INSTRUCTION_UNION = soupsieve.compile(', '.join(INSTRUCTION_SELECTORS))
+
+# Extraction methods in the order they are normally tried; each has a
+# matching try_<method>() on RecipeExtractor
+EXTRACTION_METHODS = ('recipe_scrapers', 'json_ld', 'html')
+
+# Pages that aren't HTML, or are bigger than this, are not parsed
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml')
+MAX_PAGE_BYTES = 4 * 1024 * 1024
+
+# Cached pages older than this are fetched again
+CACHE_MAX_AGE_DAYS = 7
+
+class ExtractionCache:
+    """On-disk cache of fetched pages (keyed by URL) and extracted recipes (keyed by page content)"""
+    __slots__ = ('cache_dir', 'max_age')
+
+    def __init__(self, cache_dir: Path, max_age_days: float = CACHE_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _html_path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.html.gz"
+
+    def _recipe_path(self, body: bytes) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(body).hexdigest()}.recipe.json"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        # Write to a temporary file first so concurrent readers never see a partial file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def has_html(self, url: str) -> bool:
+        """Check whether a fresh copy of the page is cached"""
+        path = self._html_path(url)
+        try:
+            return time.time() - path.stat().st_mtime < self.max_age
+        except OSError:
+            return False
+
+    def get_html(self, url: str) -> Optional[bytes]:
+        """Return the cached page body, or None if missing or stale"""
+        if not self.has_html(url):
+            return None
+        try:
+            return gzip.decompress(self._html_path(url).read_bytes())
+        except Exception as e:
+            log.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def put_html(self, url: str, body: bytes) -> None:
+        self._write(self._html_path(url), gzip.compress(body))
+
+    def get_recipe(self, body: bytes) -> Optional[Dict[str, Any]]:
+        """Return the recipe previously extracted from this page body"""
+        path = self._recipe_path(body)
+        if not path.exists():
+            return None
+        try:
+            return orjson.loads(path.read_bytes())
+        except Exception as e:
+            log.warning(f"Ignoring unreadable recipe cache entry {path.name}: {e}")
+            return None
+
+    def put_recipe(self, body: bytes, recipe: Dict[str, Any]) -> None:
+        self._write(self._recipe_path(body), orjson.dumps(recipe))
+
+# Minimum gap between requests to the same host; different hosts are not throttled
+HOST_DELAY = 5
+RATE_LIMIT_RETRIES = 2  # Retries of a URL after an HTTP 429, each after the host's backoff
+MAX_RETRY_AFTER = 60  # Longest pause honoured after a 429; a longer Retry-After gives up on the URL
+
+class HostThrottle:
+    """Per-host rate limiter: at most one request per host every min_gap seconds"""
+    __slots__ = ('min_gap', '_next_ok', '_lock')
+
+    def __init__(self, min_gap: float):
+        self.min_gap = min_gap
+        self._next_ok: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Block until a request to the host of url is allowed, and reserve that slot"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_ok.get(host, 0.0))
+            self._next_ok[host] = start + self.min_gap
+        if start > now:
+            log.info(f"Waiting {start - now:.1f} seconds before next request to {host}...")
+            time.sleep(start - now)
+
+    def back_off(self, url: str, retry_after: Optional[str]) -> bool:
+        """Pause the host after a 429 for Retry-After, up to MAX_RETRY_AFTER; False if it asked for longer"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = 6 * self.min_gap
+        # Never park a fetch thread (and every other URL on the host) for hours
+        within_cap = delay <= MAX_RETRY_AFTER
+        delay = min(delay, MAX_RETRY_AFTER)
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._next_ok[host] = max(self._next_ok.get(host, 0.0), time.monotonic() + delay)
+        log.info(f"Backing off {host} for {delay:.0f} seconds")
+        return within_cap
+
 class RecipeExtractor:
-    def __init__(self):
+    __slots__ = ('cache', 'throttle', 'headers', 'session')
+
+    def __init__(self, cache: Optional[ExtractionCache] = None):
+        self.cache = cache
+        self.throttle = HostThrottle(HOST_DELAY)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -68,87 +331,39 @@ class RecipeExtractor:
             'DNT': '1',
             'Upgrade-Insecure-Requests': '1'
         }
-          # Ingredient selectors
-        self.ingredient_selectors = [
-            # WPRM Plugin
-            '.wprm-recipe-ingredient-group .wprm-recipe-ingredient',
-            '.wprm-recipe-ingredients-container li',
-            '.wprm-recipe-ingredients li',
-            '[id*="wprm-recipe-ingredient"]',
-            
-            # Tasty Recipes Plugin
-            '.tasty-recipes-ingredients li',
-            '.tasty-recipe-ingredients li',
-            '.tasty-recipes-ingredient-item',
-            
-            # Core WP Recipe Maker
-            '.wpurp-recipe-ingredients li',
-            '.wpurp-recipe-ingredient',
-            
-            # Generic recipe plugins
-            '[class*="recipe-ingredients"] li',
-            '[class*="ingredients-list"] li',
-            '[class*="ingredient-item"]',
-            
-            # Specific recipe sites/plugins
-            '.recipe-ingredients__item',  # Whisk Affair
-            '.recipe-ingredients__list-item',  # Food Fanatic
-            '.ingredients-list__item',  # Common recipe theme
-            '[class*="ERS-ingredients"] li',
-            '[class*="recipe-ingred_str"]',
-            
-            # Schema.org standard
-            '[itemprop="recipeIngredient"]',
-            '[itemprop="ingredients"]',
-            
-            # Common HTML patterns
-            '.ingredients li',
-            '.ingredient-list li',
-            'ul.ingredients li',
-            '[class*="ingredient"] li'
-        ]
-        
-        # Instruction selectors
-        self.instruction_selectors = [
-            # WPRM Plugin
-            '.wprm-recipe-instruction-group .wprm-recipe-instruction',
-            '.wprm-recipe-instructions-container li',
-            '.wprm-recipe-instructions li',
-            '[id*="wprm-recipe-instruction"]',
-            
-            # Tasty Recipes Plugin
-            '.tasty-recipes-instructions li',
-            '.tasty-recipe-instructions li',
-            '.tasty-recipes-instruction-item',
-            
-            # Core WP Recipe Maker
-            '.wpurp-recipe-instructions li',
-            '.wpurp-recipe-instruction',
-            
-            # Generic recipe plugins
-            '[class*="recipe-instructions"] li',
-            '[class*="recipe-steps"] li',
-            '[class*="recipe-directions"] li',
-            
-            # Specific recipe sites/plugins
-            '.recipe-instructions__step',  # Whisk Affair
-            '.recipe-method__step',  # Food Fanatic
-            '.method-steps__item',  # Common recipe theme
-            '[class*="ERS-instructions"] li',
-            '[class*="recipe-method"] li',
-            
-            # Schema.org standard
-            '[itemprop="recipeInstructions"]',
-            '.instructions li',
-            '.instruction-list li',
-            'ol.instructions li',
-            '[class*="instruction"] li',
-            '[class*="step"] li'
-        ]
-        ]
+
+        # urllib3 only decodes Brotli when a brotli package is installed;
+        # without one, don't advertise it so servers fall back to gzip
+        if not brotli_available():
+            log.info("brotli not installed, not requesting Brotli-compressed pages")
+            self.headers['Accept-Encoding'] = 'gzip, deflate'
+
+        # Shared session so connections to the same host are kept alive and
+        # reused across URLs (and across worker threads)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # 429s are left to HostThrottle, so all waiting on a host goes through one place;
+        # urllib3 would otherwise sleep for Retry-After inside the worker without bound
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            respect_retry_after_header=False,
+            raise_on_status=False  # Hand the last response back so 403s are still reported
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def test_extraction(self, url: str) -> Dict[str, Any]:
         """Extract recipe data from a URL using multiple methods"""
+        results, body = self.fetch(url)
+        if body is None:
+            return results
+        return self.extract(results, body)
+
+    def fetch(self, url: str) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """Download a page (or load it from the cache); body is None if there is nothing to extract"""
         log.info(f"\n{'='*80}\nTesting recipe extraction from: {url}\n{'='*80}")
         
         results = {
@@ -159,82 +374,122 @@ class RecipeExtractor:
             'html': {'success': False},
             'errors': [],
             'warnings': [],
+            'cache': {'html': False, 'recipe': False},
+            'method': None,
             'final_recipe': None
         }
 
         try:
-            # Test HTTP request with a longer timeout
-            response = requests.get(url, headers=self.headers, timeout=20)
-            results['http_response'] = {
-                'status_code': response.status_code,
-                'headers': dict(response.headers),
-                'content_length': len(response.content),
-                'encoding': response.encoding
-            }
-            
-            # Check for rate limiting
-            if response.status_code == 429:
-                log.error("Rate limited by the website")
-                results['errors'].append("Rate limited (HTTP 429)")
-                return results
-                
-            if response.status_code == 403:
-                log.error("Access forbidden - possibly due to anti-scraping measures")
-                results['errors'].append("Access forbidden (HTTP 403)")
-                return results
-                
-            response.raise_for_status()
-            
-            # 1. Try recipe-scrapers
-            try:
-                log.info("Attempting recipe-scrapers...")
-                scraper = scrape_me(url)
-                recipe_data = {
-                    'success': True,
-                    'title': scraper.title(),
-                    'ingredients': scraper.ingredients(),
-                    'instructions': scraper.instructions(),
-                    'total_time': str(scraper.total_time()),
-                    'yields': str(scraper.yields())
+            body = self.cache.get_html(url) if self.cache else None
+            if body is not None:
+                log.info("Using cached page")
+                results['cache']['html'] = True
+                return results, body
+
+            # Test HTTP request with a longer timeout; the body is streamed so
+            # it can be checked before (and capped while) it is downloaded
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                self.throttle.wait(url)
+                response = self.session.get(url, timeout=20, stream=True)
+                if response.status_code != 429:
+                    break
+                # The host is paused either way; only retry if the wait asked for is reasonable
+                if not self.throttle.back_off(url, response.headers.get('Retry-After')) \
+                        or attempt == RATE_LIMIT_RETRIES:
+                    break
+                log.warning("Rate limited by the website, retrying once the host's backoff is over")
+                response.close()
+
+            with response:
+                results['http_response'] = {
+                    'status_code': response.status_code,
+                    'headers': dict(response.headers),
+                    'content_length': None,
+                    'encoding': response.encoding
                 }
-                results['recipe_scrapers'] = recipe_data
-                log.info("Successfully extracted with recipe-scrapers")
                 
-                # If recipe-scrapers worked well, use it as final recipe
-                results['final_recipe'] = self.format_recipe_data(recipe_data)
-                
-            except WebsiteNotImplementedError as e:
-                log.warning(f"recipe-scrapers not supported: {e}")
-                results['errors'].append(f"recipe-scrapers error: {str(e)}")
-            except Exception as e:
-                log.error(f"recipe-scrapers failed: {e}")
-                results['errors'].append(f"recipe-scrapers error: {str(e)}")
-
-            # Parse with BeautifulSoup for further extraction attempts
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 2. Try JSON-LD extraction if recipe-scrapers failed
-            if not results['final_recipe']:
-                json_ld_results = self.extract_json_ld(soup)
-                results['json_ld'] = json_ld_results
-                
-                if json_ld_results and json_ld_results.get('success'):
-                    results['final_recipe'] = json_ld_results.get('recipe')
-                    log.info("Using JSON-LD data for final recipe")
-            
-            # 3. Try HTML structure extraction if other methods failed
-            if not results['final_recipe']:
-                html_results = self.extract_from_html(soup, url)
-                results['html'] = html_results
-                
-                if html_results and html_results.get('success'):
-                    results['final_recipe'] = html_results.get('recipe')
-                    log.info("Using HTML structure data for final recipe")
+                # Check for rate limiting
+                if response.status_code == 429:
+                    log.error("Rate limited by the website")
+                    results['errors'].append("Rate limited (HTTP 429)")
+                    return results, None
+                    
+                if response.status_code == 403:
+                    log.error("Access forbidden - possibly due to anti-scraping measures")
+                    results['errors'].append("Access forbidden (HTTP 403)")
+                    return results, None
+                    
+                response.raise_for_status()
+
+                content_type = response.headers.get('Content-Type', '').lower()
+                if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+                    log.error(f"Not an HTML page: {content_type}")
+                    results['errors'].append(f"Not an HTML page ({content_type})")
+                    return results, None
+
+                declared_length = response.headers.get('Content-Length', '')
+                if declared_length.isdigit() and int(declared_length) > MAX_PAGE_BYTES:
+                    log.error(f"Page is larger than {MAX_PAGE_BYTES // (1024 * 1024)} MB, skipping")
+                    results['errors'].append(f"Page too large ({declared_length} bytes)")
+                    return results, None
+
+                chunks = []
+                total = 0
+                for chunk in response.iter_content(65536):
+                    total += len(chunk)
+                    if total > MAX_PAGE_BYTES:
+                        log.error(f"Page is larger than {MAX_PAGE_BYTES // (1024 * 1024)} MB, skipping")
+                        results['errors'].append(f"Page too large (over {MAX_PAGE_BYTES} bytes)")
+                        return results, None
+                    chunks.append(chunk)
+                body = b''.join(chunks)
+                results['http_response']['content_length'] = len(body)
+
+            if self.cache:
+                self.cache.put_html(url, body)
+            return results, body
+
+        except Exception as e:
+            log.error(f"Extraction failed: {e}")
+            results['errors'].append(f"Extraction error: {str(e)}")
+            return results, None
+
+    def extract(self, results: Dict[str, Any], body: bytes, preferred: Optional[str] = None) -> Dict[str, Any]:
+        """Run the extraction methods on a fetched page (CPU only, safe to run in a worker process)
+
+        preferred names the method that worked for an earlier page on the same
+        host; it is tried first and the others only run if it fails.
+        """
+        try:
+            # 0. Reuse a recipe already extracted from this exact page
+            cached_recipe = self.cache.get_recipe(body) if self.cache else None
+            if cached_recipe and self.is_valid_recipe(cached_recipe):
+                log.info("Using cached recipe")
+                results['cache']['recipe'] = True
+                results['final_recipe'] = cached_recipe
+                self.validate_recipe(cached_recipe)
+                return results
+
+            # 1. recipe-scrapers, 2. JSON-LD, 3. HTML structure
+            methods = list(EXTRACTION_METHODS)
+            if preferred in methods:
+                methods.remove(preferred)
+                methods.insert(0, preferred)
+                log.info(f"Trying {preferred} first, it worked for this host before")
+
+            for method in methods:
+                recipe = getattr(self, f'try_{method}')(results, body)
+                if recipe:
+                    results['final_recipe'] = recipe
+                    results['method'] = method
+                    break
 
             # Validate final recipe
             if results['final_recipe']:
                 self.validate_recipe(results['final_recipe'])
                 log.info("Final recipe validated successfully")
+                if self.cache:
+                    self.cache.put_recipe(body, results['final_recipe'])
             else:
                 log.error("No usable recipe could be extracted")
                 results['errors'].append("No usable recipe could be extracted")
@@ -245,6 +500,57 @@ class RecipeExtractor:
 
         return results
 
+    def try_recipe_scrapers(self, results: Dict[str, Any], body: bytes) -> Optional[Dict[str, Any]]:
+        """Extract the recipe with recipe-scrapers"""
+        try:
+            log.info("Attempting recipe-scrapers...")
+            # Hand over the page we already have instead of letting it fetch again
+            # Cached pages have no response, so their charset is sniffed from the markup
+            encoding = (results['http_response'] or {}).get('encoding')
+            scraper = scrape_html(decode_html(body, encoding), org_url=results['url'])
+            recipe_data = {
+                'success': True,
+                'title': scraper.title(),
+                'ingredients': scraper.ingredients(),
+                'instructions': scraper.instructions(),
+                'total_time': str(scraper.total_time()),
+                'yields': str(scraper.yields())
+            }
+            results['recipe_scrapers'] = recipe_data
+            log.info("Successfully extracted with recipe-scrapers")
+            
+            # If recipe-scrapers worked well, use it as final recipe
+            return self.format_recipe_data(recipe_data)
+            
+        except WebsiteNotImplementedError as e:
+            log.warning(f"recipe-scrapers not supported: {e}")
+            results['errors'].append(f"recipe-scrapers error: {str(e)}")
+        except Exception as e:
+            log.error(f"recipe-scrapers failed: {e}")
+            results['errors'].append(f"recipe-scrapers error: {str(e)}")
+        return None
+
+    def try_json_ld(self, results: Dict[str, Any], body: bytes) -> Optional[Dict[str, Any]]:
+        """Extract the recipe from JSON-LD structured data"""
+        # Only the script tags are needed here, so skip building the rest of the DOM
+        json_ld_results = self.extract_json_ld(make_soup(body, JSON_LD_STRAINER))
+        results['json_ld'] = json_ld_results
+        
+        if json_ld_results and json_ld_results.get('success'):
+            log.info("Using JSON-LD data for final recipe")
+            return json_ld_results.get('recipe')
+        return None
+
+    def try_html(self, results: Dict[str, Any], body: bytes) -> Optional[Dict[str, Any]]:
+        """Extract the recipe from the HTML structure"""
+        html_results = self.extract_from_html(make_soup(body), results['url'])
+        results['html'] = html_results
+        
+        if html_results and html_results.get('success'):
+            log.info("Using HTML structure data for final recipe")
+            return html_results.get('recipe')
+        return None
+
     def extract_json_ld(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract recipe data from JSON-LD structured data"""
         log.info("\nAttempting JSON-LD extraction...")
@@ -256,19 +562,20 @@ class RecipeExtractor:
         }
 
         try:
-            json_scripts = soup.find_all('script', type='application/ld+json') + \
-                         soup.find_all('script', type='application/json')
+            # Single pass over the tree; ld+json blocks are still tried before plain JSON
+            json_scripts = soup.find_all('script', attrs={'type': ['application/ld+json', 'application/json']})
+            json_scripts.sort(key=lambda script: script.get('type') != 'application/ld+json')
             
             log.info(f"Found {len(json_scripts)} JSON-LD scripts")
             
             for script in json_scripts:
                 try:
                     # Clean the JSON string
-                    json_str = re.sub(r'[\x00-\x1F\x7F]', '', script.string or '')
+                    json_str = (script.string or '').translate(CONTROL_CHARS_TABLE)
                     if not json_str:
                         continue
                         
-                    data = json.loads(json_str)
+                    data = orjson.loads(json_str)
                     result['raw_data'] = data
                     
                     # Find Recipe schema
@@ -282,7 +589,7 @@ class RecipeExtractor:
                             result['recipe'] = parsed_recipe
                             return result
                 
-                except json.JSONDecodeError as e:
+                except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
                     result['errors'].append(f"JSON decode error: {str(e)}")
                 except Exception as e:
                     result['errors'].append(f"JSON-LD parsing error: {str(e)}")
@@ -296,35 +603,8 @@ class RecipeExtractor:
             return result
 
     def find_recipe_schema(self, data: Any) -> Optional[Dict[str, Any]]:
-        """Find Recipe schema in JSON-LD data"""
-        def is_recipe(obj):
-            if isinstance(obj, dict):
-                type_value = obj.get('@type')
-                return type_value == 'Recipe' or (
-                    isinstance(type_value, list) and 'Recipe' in type_value
-                )
-            return False
-
-        def search_recursive(obj):
-            if isinstance(obj, dict):
-                if is_recipe(obj):
-                    return obj
-                if '@graph' in obj:
-                    for item in obj['@graph']:
-                        if isinstance(item, dict) and is_recipe(item):
-                            return item
-                for value in obj.values():
-                    result = search_recursive(value)
-                    if result:
-                        return result
-            elif isinstance(obj, list):
-                for item in obj:
-                    result = search_recursive(item)
-                    if result:
-                        return result
-            return None
-
-        return search_recursive(data)
+        """Find Recipe schema in JSON-LD data, the same way the converter does"""
+        return find_recipe_node(data)
 
     def extract_from_html(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         """Extract recipe data from HTML structure"""
@@ -347,33 +627,19 @@ class RecipeExtractor:
                 'instructions': []
             }
 
-            # Test each ingredient selector
-            for selector in self.ingredient_selectors:
-                try:
-                    elements = soup.select(selector)
-                    if elements:
-                        ingredients = [el.get_text().strip() for el in elements if el.get_text().strip()]
-                        if ingredients:
-                            log.info(f"Found {len(ingredients)} ingredients with selector: {selector}")
-                            result['matched_selectors']['ingredients'].append(selector)
-                            recipe['ingredients'] = ingredients
-                            break
-                except Exception as e:
-                    result['errors'].append(f"Ingredient selector error ({selector}): {str(e)}")
+            # Search inside the recipe card first; plugin markup keeps the
+            # ingredient/instruction lists there, so most selectors only have
+            # to walk a small subtree instead of the whole page
+            root = self.find_recipe_root(soup)
+            scopes = [root, soup] if root is not None else [soup]
 
-            # Test each instruction selector
-            for selector in self.instruction_selectors:
-                try:
-                    elements = soup.select(selector)
-                    if elements:
-                        instructions = [el.get_text().strip() for el in elements if el.get_text().strip()]
-                        if instructions:
-                            log.info(f"Found {len(instructions)} instructions with selector: {selector}")
-                            result['matched_selectors']['instructions'].append(selector)
-                            recipe['instructions'] = instructions
-                            break
-                except Exception as e:
-                    result['errors'].append(f"Instruction selector error ({selector}): {str(e)}")
+            for field, union, matchers in (
+                    ('ingredients', INGREDIENT_UNION, INGREDIENT_MATCHERS),
+                    ('instructions', INSTRUCTION_UNION, INSTRUCTION_MATCHERS)):
+                for scope in scopes:
+                    recipe[field] = self.select_texts(scope, union, matchers, field, result)
+                    if recipe[field]:
+                        break
 
             if recipe['ingredients'] or recipe['instructions']:
                 result['success'] = True
@@ -388,24 +654,38 @@ class RecipeExtractor:
 
         return result
 
+    def find_recipe_root(self, soup: BeautifulSoup):
+        """Find the recipe card container, if the page has one"""
+        for matcher in RECIPE_ROOT_MATCHERS:
+            try:
+                element = matcher.select_one(soup)
+                if element:
+                    return element
+            except Exception:
+                continue
+        return None
+
+    def select_texts(self, root, union: soupsieve.SoupSieve, matchers: List[soupsieve.SoupSieve],
+                     field: str, result: Dict[str, Any]) -> List[str]:
+        """Return the element texts of the first selector that matches under root"""
+        try:
+            selector, texts = select_first_texts(root, union, matchers)
+        except Exception as e:
+            result['errors'].append(f"{field[:-1].capitalize()} selector error ({union.pattern}): {str(e)}")
+            return []
+        if texts:
+            log.info(f"Found {len(texts)} {field} with selector: {selector}")
+            result['matched_selectors'][field].append(selector)
+        return texts
+
     def extract_title(self, soup: BeautifulSoup) -> str:
         """Extract recipe title from HTML"""
-        title_selectors = [
-            'h1.recipe-title',
-            'h1.entry-title',
-            'h1[class*="recipe"]',
-            'h1[class*="title"]',
-            '.wprm-recipe-name',  # WPRM specific
-            '.recipe-title',
-            'h1',
-            'title'
-        ]
-        
-        for selector in title_selectors:
+        for matcher in TITLE_MATCHERS:
             try:
-                element = soup.select_one(selector)
-                if element and element.get_text().strip():
-                    return element.get_text().strip()
+                element = matcher.select_one(soup)
+                title = element.get_text().strip() if element else ''
+                if title:
+                    return title
             except:
                 continue
         
@@ -440,7 +720,7 @@ class RecipeExtractor:
             return str(inst) if inst else ''
 
         if isinstance(raw_instructions, str):
-            steps = re.split(r'\n+|\d+\.\s*|\d+\)\s*', raw_instructions)
+            steps = STEP_SPLIT_RE.split(raw_instructions)
             instructions = [step.strip() for step in steps if step.strip()]
         elif isinstance(raw_instructions, (list, tuple)):
             for inst in raw_instructions:
@@ -469,7 +749,7 @@ class RecipeExtractor:
         if isinstance(instructions, list):
             return [str(step).strip() for step in instructions if str(step).strip()]
         elif isinstance(instructions, str):
-            steps = re.split(r'\n+|\d+\.\s*|\d+\)\s*', instructions)
+            steps = STEP_SPLIT_RE.split(instructions)
             return [step.strip() for step in steps if step.strip()]
         return []
 
@@ -493,77 +773,174 @@ class RecipeExtractor:
         elif len(recipe['instructions']) < 2:
             log.warning(f"Recipe has very few instructions: {len(recipe['instructions'])}")
 
+# Number of pages downloaded at the same time
+MAX_WORKERS = 8
+
+def interleave_by_host(urls: List[str]) -> List[str]:
+    """Order URLs round-robin across hosts so workers don't queue up on one host"""
+    by_host: Dict[str, List[str]] = {}
+    for url in urls:
+        by_host.setdefault(urlsplit(url).netloc, []).append(url)
+    groups = list(by_host.values())
+    ordered = []
+    for i in range(max((len(g) for g in groups), default=0)):
+        ordered.extend(g[i] for g in groups if i < len(g))
+    return ordered
+
+def strip_verbose_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop response headers and raw JSON-LD data from a result before saving it"""
+    record = dict(result)
+    if record.get('http_response'):
+        record['http_response'] = {k: v for k, v in record['http_response'].items() if k != 'headers'}
+    if record.get('json_ld'):
+        record['json_ld'] = {k: v for k, v in record['json_ld'].items() if k != 'raw_data'}
+    return record
+
+def print_summary(url: str, result: Dict[str, Any]) -> None:
+    """Print a human readable summary of a single extraction result"""
+    print(f"\nSummary for {url}:")
+    print("-" * 80)
+    
+    cache = result.get('cache', {})
+    if cache.get('recipe'):
+        print("Cache: recipe reused from a previous run")
+    elif cache.get('html'):
+        print("Cache: page reused from a previous run")
+
+    if result['http_response']:
+        print(f"HTTP Status: {result['http_response']['status_code']}")
+        
+        # Check rate limiting headers
+        headers = result['http_response'].get('headers', {})
+        rate_limit_remaining = headers.get('x-ratelimit-remaining', 
+                                         headers.get('x-rate-limit-remaining'))
+        if rate_limit_remaining:
+            print(f"Rate limit remaining: {rate_limit_remaining}")
+    
+    print("\nExtraction Methods:")
+    print("1. recipe-scrapers:", "Success" if result.get('recipe_scrapers', {}).get('success') else "Failed")
+    print("2. JSON-LD:", "Success" if result.get('json_ld', {}).get('success') else "Failed")
+    print("3. HTML Structure:", "Success" if result.get('html', {}).get('success') else "Failed")
+    
+    if result.get('final_recipe'):
+        print("\nExtracted Recipe:")
+        print(f"Title: {result['final_recipe'].get('title', 'Unknown')}")
+        print(f"Ingredients: {len(result['final_recipe'].get('ingredients', []))} items")
+        print(f"Instructions: {len(result['final_recipe'].get('instructions', []))} steps")
+    
+    if result.get('errors'):
+        print("\nErrors:")
+        for error in result['errors']:
+            print(f"- {error}")
+    
+    print("\n" + "="*80 + "\n")
+
+# Per-process extractor used by the extraction worker pool
+_worker_extractor: Optional['RecipeExtractor'] = None
+
+def create_cache(args) -> Optional[ExtractionCache]:
+    """Open the page/recipe cache, or return None when --no-cache was given"""
+    return None if args.no_cache else ExtractionCache(args.cache_dir)
+
+def init_extract_worker(log_file: Path, cache: Optional[ExtractionCache]) -> None:
+    """Set up logging and an extractor in a freshly started worker process"""
+    global _worker_extractor
+    setup_logging(log_file)
+    _worker_extractor = RecipeExtractor(cache)
+
+def extract_in_worker(results: Dict[str, Any], body: bytes, preferred: Optional[str]) -> Dict[str, Any]:
+    """Run the parsing/extraction step in a worker process"""
+    return _worker_extractor.extract(results, body, preferred)
+
 def main():
-    urls = get_urls()
+    args = parse_args()
+
+    log_dir = Path(__file__).parent / "logs"
+    log_dir.mkdir(exist_ok=True)
+    log_file = log_dir / f'recipe_extraction_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    setup_logging(log_file)
+
+    urls = get_urls(args.urls)
     
     if not urls:
         log.error("No URLs found to process")
         sys.exit(1)
 
-    extractor = RecipeExtractor()
+    cache = create_cache(args)
+    extractor = RecipeExtractor(cache)
     results = []
     results_dir = Path(__file__).parent / "results"
     results_dir.mkdir(exist_ok=True)
-
-    for i, url in enumerate(urls, 1):
-        url = url.strip()
-        if not url:
-            continue
-            
-        log.info(f"\nTesting URL {i}/{len(urls)}: {url}")
+    output_file = results_dir / f'extraction_results_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl'
+
+    urls = interleave_by_host([url.strip() for url in urls if url.strip()])
+    finished = 0
+    # Extraction method that last worked for each host
+    host_strategy: Dict[str, str] = {}
+
+    def save_result(url: str, result: Dict[str, Any]) -> None:
+        nonlocal finished
+        finished += 1
+        if result.get('method'):
+            host_strategy[urlsplit(url).netloc] = result['method']
+        log.info(f"\nFinished URL {finished}/{len(urls)}: {url}")
+        print_summary(url, result)
+        record = result if args.verbose else strip_verbose_fields(result)
+        out.write(orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS) + b'\n')
+        out.flush()
+        if args.aggregate:
+            results.append(record)
+
+    # Pages are downloaded on a thread pool and parsed on a process pool, so
+    # parsing runs on all cores while other downloads are still in flight.
+    # Each result is written as one JSON line as soon as it completes, so
+    # an interrupted run keeps everything finished so far. Workers are spawned,
+    # not forked, since forking while the fetch threads hold locks can deadlock
+    with open(output_file, 'wb') as out, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=init_extract_worker,
+                                initargs=(log_file, cache),
+                                mp_context=multiprocessing.get_context('spawn')) as extract_pool:
+        # Fetch different hosts in parallel; the extractor's throttle spaces
+        # out requests to the same host
+        fetches = {fetch_pool.submit(extractor.fetch, url): url for url in urls}
+
+        extractions = {}
+        pending = set(fetches)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    url = fetches.pop(future)
+                    try:
+                        result, body = future.result()
+                    except Exception as e:
+                        log.error(f"Failed to test {url}: {e}")
+                        continue
+                    if body is None:
+                        save_result(url, result)
+                        continue
+                    extraction = extract_pool.submit(extract_in_worker, result, body,
+                                                     host_strategy.get(urlsplit(url).netloc))
+                    extractions[extraction] = url
+                    pending.add(extraction)
+                else:
+                    url = extractions.pop(future)
+                    try:
+                        save_result(url, future.result())
+                    except Exception as e:
+                        log.error(f"Failed to test {url}: {e}")
+    log.info(f"\nDetailed results saved to {output_file}")
+
+    # Optionally also save all results as a single JSON document
+    if args.aggregate:
+        aggregate_file = output_file.with_suffix('.json')
         try:
-            result = extractor.test_extraction(url)
-            results.append(result)
-            
-            # Print summary
-            print(f"\nSummary for {url}:")
-            print("-" * 80)
-            
-            if result['http_response']:
-                print(f"HTTP Status: {result['http_response']['status_code']}")
-                
-                # Check rate limiting headers
-                headers = result['http_response'].get('headers', {})
-                rate_limit_remaining = headers.get('x-ratelimit-remaining', 
-                                                 headers.get('x-rate-limit-remaining'))
-                if rate_limit_remaining:
-                    print(f"Rate limit remaining: {rate_limit_remaining}")
-            
-            print("\nExtraction Methods:")
-            print("1. recipe-scrapers:", "Success" if result.get('recipe_scrapers', {}).get('success') else "Failed")
-            print("2. JSON-LD:", "Success" if result.get('json_ld', {}).get('success') else "Failed")
-            print("3. HTML Structure:", "Success" if result.get('html', {}).get('success') else "Failed")
-            
-            if result.get('final_recipe'):
-                print("\nExtracted Recipe:")
-                print(f"Title: {result['final_recipe'].get('title', 'Unknown')}")
-                print(f"Ingredients: {len(result['final_recipe'].get('ingredients', []))} items")
-                print(f"Instructions: {len(result['final_recipe'].get('instructions', []))} steps")
-            
-            if result.get('errors'):
-                print("\nErrors:")
-                for error in result['errors']:
-                    print(f"- {error}")
-            
-            print("\n" + "="*80 + "\n")
-            
-            # Add longer delay between requests to avoid rate limiting
-            if i < len(urls):
-                delay = 10  # 10 seconds between requests
-                log.info(f"Waiting {delay} seconds before next request...")
-                time.sleep(delay)
-            
+            with open(aggregate_file, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            log.info(f"Aggregated results saved to {aggregate_file}")
         except Exception as e:
-            log.error(f"Failed to test {url}: {e}")
-
-    # Save detailed results to JSON in results directory
-    output_file = results_dir / f'extraction_results_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        log.info(f"\nDetailed results saved to {output_file}")
-    except Exception as e:
-        log.error(f"Failed to save results: {e}")
+            log.error(f"Failed to save aggregated results: {e}")
 
 if __name__ == '__main__':
     main()
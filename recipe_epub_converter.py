@@ -1,13 +1,20 @@
 import sys
 import os
-import json
-import requests
-from urllib.parse import urljoin, urlparse
+import hashlib
+import gzip
+import time
+import zipfile
+import mmap
+import asyncio
+import httpx
+from urllib.parse import urlparse, urldefrag
 from pathlib import Path
-import tempfile
-import shutil
 from datetime import datetime
 from io import BytesIO
+from html import escape
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
+from contextlib import nullcontext
 from PIL import Image
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
@@ -15,14 +22,150 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                             QMessageBox, QFileDialog, QListWidget, QSplitter,
                             QListWidgetItem, QScrollArea, QFrame, QLineEdit, QStyle, 
                             QStyledItemDelegate, QInputDialog, QSizePolicy, QDialog)
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QModelIndex
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal, Qt, QModelIndex
 from PyQt6.QtGui import QFont, QPixmap, QIcon
 
-from bs4 import BeautifulSoup
 from ebooklib import epub
 import re
-from recipe_scrapers import scrape_me
-from recipe_scrapers._exceptions import WebsiteNotImplementedError
+
+from recipe_parser import decode_html, parse_recipe_page, parse_retry_after
+
+# Browser-like headers for recipe page requests
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Cache-Control': 'max-age=0',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Referer': 'https://www.google.com/'
+}
+
+MAX_CONCURRENT_FETCHES = 10  # Recipe pages downloaded at the same time
+MAX_FETCHES_PER_HOST = 2  # Keep it gentle on any single site, even over one HTTP/2 connection
+HOST_REQUEST_INTERVAL = 1.0  # Minimum seconds between requests to the same site
+PARSE_POOL_MIN_URLS = 8  # Below this, starting parse worker processes costs more than it saves
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml')
+MAX_PAGE_BYTES = 4 * 1024 * 1024  # Anything bigger is not a recipe page
+# Pages that gave a complete recipe are kept a day, so re-running an extraction skips the network
+PAGE_CACHE_DIR = Path.home() / '.cache' / 'recipe_epub'
+PAGE_CACHE_MAX_AGE = 24 * 60 * 60
+
+# Titles may hold brackets and URLs may hold parentheses, so take everything
+# between the last '](' on the line and the ')' that ends it
+MARKDOWN_LINK_RE = re.compile(rb'(?m)^- \[.*\]\((\S+)\)[ \t\r]*$')
+
+# Image media type -> file extension for images embedded in the EPUB
+IMAGE_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp'
+}
+IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF8', 'image/gif')
+]
+
+MAX_IMAGE_DIMENSION = 1200  # Plenty for e-reader screens
+MAX_IMAGE_BYTES = 8 * 1024 * 1024  # Bigger downloads are abandoned
+IMAGE_RETRY_STATUSES = (429, 500, 502, 503, 504)
+IMAGE_RETRIES = 2
+IMAGE_RETRY_BACKOFF = 0.3  # Seconds, doubled on every retry
+MAX_IMAGE_RETRY_WAIT = 10  # A longer Retry-After isn't worth holding up the book for
+EPUB_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF')  # Formats every reader can show as-is
+
+# Category -> keywords, checked in order against a recipe's title and ingredients
+CATEGORY_KEYWORDS = (
+    ('Dessert', ('cake', 'cookie', 'pie', 'dessert', 'sweet', 'chocolate', 'ice cream', 'pudding')),
+    ('Breakfast', ('breakfast', 'pancake', 'waffle', 'eggs', 'omelette', 'oatmeal', 'cereal')),
+    ('Appetizer', ('appetizer', 'snack', 'dip', 'starter')),
+    ('Soup', ('soup', 'stew', 'broth', 'chowder')),
+    ('Salad', ('salad', 'slaw')),
+    ('Main Course', ('chicken', 'beef', 'pork', 'fish', 'salmon', 'pasta', 'rice')),
+    ('Vegetarian', ('tofu', 'vegetarian', 'vegan')),
+    ('Side Dish', ('side', 'vegetable', 'potato', 'rice')),
+    ('Bread', ('bread', 'roll', 'bun', 'muffin')),
+    ('Beverage', ('drink', 'cocktail', 'smoothie', 'juice'))
+)
+MEAT_INGREDIENTS = ('chicken', 'beef', 'pork', 'fish', 'salmon', 'lamb', 'turkey')
+
+def shrink_image(data):
+    """Downscale an oversized (or reader-unfriendly) image to a JPEG, returning None to keep the original"""
+    img = Image.open(BytesIO(data))
+    if img.format in EPUB_IMAGE_FORMATS and max(img.size) <= MAX_IMAGE_DIMENSION:
+        return None
+    # Let libjpeg decode straight at a reduced scale instead of at full resolution
+    img.draft('RGB', (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+    img.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION), Image.Resampling.LANCZOS)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparency onto white rather than letting JPEG turn it black
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, 'white')
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    with BytesIO() as output:
+        img.convert('RGB').save(output, format='JPEG', quality=82, optimize=True, progressive=True)
+        return output.getvalue()
+
+def image_media_type(data, content_type):
+    """Work out an image's media type from its Content-Type, or its first bytes if that is missing or wrong"""
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    if media_type in IMAGE_EXTENSIONS:
+        return media_type
+    for signature, signature_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return signature_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'  # default
+
+def markdown_link(title, url):
+    """Format one line of the saved links file, as read back by MARKDOWN_LINK_RE"""
+    # A newline in the title would split the line, and a space would end the URL
+    title = ' '.join(str(title).split())
+    url = url.strip().replace(' ', '%20')
+    return f"- [{title}]({url})\n"
+
+def page_cache_path(url):
+    return PAGE_CACHE_DIR / f"{hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()}.html.gz"
+
+def load_cached_page(url):
+    """Return the page saved by an earlier extraction, or None if it is missing or stale"""
+    path = page_cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime > PAGE_CACHE_MAX_AGE:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, EOFError, UnicodeDecodeError):
+        return None
+
+def save_cached_page(url, html):
+    path = page_cache_path(url)
+    try:
+        PAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so a half-written page is never read back
+        temp_path = path.with_suffix('.tmp')
+        with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=1) as f:
+            f.write(html)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Failed to cache page {url}: {e}")
+
+def create_session():
+    """Create a pooled HTTP/2 client, so images from the same CDN share one connection"""
+    # Transport retries only cover failed connects, download_image retries 429/5xx responses itself
+    transport = httpx.HTTPTransport(http2=True, retries=2,
+                                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=20))
+    return httpx.Client(transport=transport, headers={'User-Agent': REQUEST_HEADERS['User-Agent']},
+                        timeout=10, follow_redirects=True)
 
 class RecipeExtractor(QThread):
     progress_updated = pyqtSignal(int)
@@ -35,54 +178,10 @@ class RecipeExtractor(QThread):
         super().__init__()
         self.urls = urls
         self.recipes = []
+        self.unsupported_hosts = set()  # Sites recipe-scrapers has no scraper for
 
     def run(self):
-        total_urls = len(self.urls)
-        processed_urls = []
-        retry_delay = 3  # Initial delay between retries in seconds
-        max_retries = 2  # Maximum number of retries per URL
-        
-        for i, url in enumerate(self.urls):
-            url = url.strip()
-            if not url or url in processed_urls:
-                continue
-                
-            retries = 0
-            while retries <= max_retries:
-                try:
-                    self.status_updated.emit(f"Processing recipe {i+1} of {total_urls} (attempt {retries + 1})...")
-                    recipe = self.extract_recipe(url)
-                    if recipe and recipe.get('ingredients') and recipe.get('instructions'):
-                        self.recipes.append(recipe)
-                        self.recipe_extracted.emit(recipe)
-                        processed_urls.append(url)
-                        # Add delay before next URL to avoid rate limiting
-                        if i < total_urls - 1:  # If not the last URL
-                            import time
-                            time.sleep(3)  # 3 second delay between successful extractions
-                        break  # Success, exit retry loop
-                    else:
-                        if retries < max_retries:
-                            self.status_updated.emit(f"Retrying {url} in {retry_delay} seconds...")
-                            import time
-                            time.sleep(retry_delay)
-                            retry_delay *= 2  # Exponential backoff
-                            retries += 1
-                        else:
-                            self.error_occurred.emit(f"Couldn't extract complete recipe from {url} after {max_retries + 1} attempts")
-                            break
-                except Exception as e:
-                    if retries < max_retries:
-                        self.status_updated.emit(f"Error occurred, retrying {url} in {retry_delay} seconds...")
-                        import time
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                        retries += 1
-                    else:
-                        self.error_occurred.emit(f"Error extracting from {url} after {max_retries + 1} attempts: {str(e)}")
-                        break
-            
-            self.progress_updated.emit(int((i + 1) / total_urls * 100))
+        asyncio.run(self.extract_all())
         
         if self.recipes:
             self.status_updated.emit(f"Successfully extracted {len(self.recipes)} recipes")
@@ -91,389 +190,231 @@ class RecipeExtractor(QThread):
         
         self.extraction_complete.emit(self.recipes)
 
-    def extract_recipe(self, url):
-        print(f"\nAttempting to extract recipe from: {url}")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Cache-Control': 'max-age=0',
-            'DNT': '1',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Referer': 'https://www.google.com/'
-        }
-
-        try:
-            print("Attempting recipe-scrapers...")
-            # First try using recipe-scrapers without wild mode
-            scraper = scrape_me(url)
-            recipe_data = {
-                'url': url,
-                'title': scraper.title(),
-                'description': '',
-                'prep_time': '',
-                'cook_time': '',
-                'total_time': '',
-                'servings': '',
-                'ingredients': [],
-                'instructions': [],
-                'image_url': None
-            }
-            
-            try: recipe_data['description'] = scraper.description()
-            except: pass
-            try: recipe_data['prep_time'] = str(scraper.prep_time())
-            except: pass
-            try: recipe_data['cook_time'] = str(scraper.cook_time())
-            except: pass
-            try: recipe_data['total_time'] = str(scraper.total_time())
-            except: pass
-            try: recipe_data['servings'] = str(scraper.yields())
-            except: pass
-            try:
-                ingredients = scraper.ingredients()
-                print(f"Found {len(ingredients)} ingredients")
-                recipe_data['ingredients'] = ingredients
-            except Exception as e:
-                print(f"Failed to get ingredients: {str(e)}")
-                pass
-            try: 
-                print("Trying to get instructions...")
-                if hasattr(scraper, 'instructions_list'):
-                    instructions = scraper.instructions_list()
-                    print(f"Found {len(instructions)} instructions from list")
-                    recipe_data['instructions'] = instructions
-                else:
-                    instructions = scraper.instructions()
-                    print(f"Got instructions string: {instructions[:100]}...")
-                    if isinstance(instructions, str):
-                        # Split by newlines or numbers at start of line
-                        steps = [s.strip() for s in re.split(r'\n+|\d+\.|^\d+\)', instructions, flags=re.MULTILINE)]
-                        recipe_data['instructions'] = [s for s in steps if s]
-                        print(f"Split into {len(recipe_data['instructions'])} steps")
-                    else:
-                        recipe_data['instructions'] = instructions
-                        print(f"Using instructions as-is, type: {type(instructions)}")
-            except Exception as e:
-                print(f"Failed to get instructions: {str(e)}")
-                pass
-            try: recipe_data['image_url'] = scraper.image()
-            except: pass
-
-            # If we got the crucial data, return it
-            if recipe_data['title'] and (recipe_data['ingredients'] or recipe_data['instructions']):
-                return recipe_data
+    async def extract_all(self):
+        # Skip blanks and duplicates, keeping the original order
+        urls = list(dict.fromkeys(url.strip() for url in self.urls if url.strip()))
+        total_urls = len(urls)
+        if not total_urls:
+            return
 
-        except Exception as e:
-            print(f"Recipe-scraper failed: {str(e)}")
-            
-        # Fallback to our custom parser for unsupported sites
-        print("Trying custom parser...")
-        try:
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            print("Looking for JSON-LD recipe data...")
-            # Try to find JSON-LD structured data first
-            json_scripts = soup.find_all('script', type='application/ld+json') + soup.find_all('script', type='application/json')
-            print(f"Found {len(json_scripts)} JSON-LD scripts")
-            recipe_data = None
-            
-            for script in json_scripts:
-                try:
-                    # Clean the JSON string - some sites have invalid characters
-                    json_str = re.sub(r'[\x00-\x1F\x7F]', '', script.string)
-                    data = json.loads(json_str)
-                    
-                    # Handle different JSON-LD structures
-                    if isinstance(data, list):
-                        # Find first recipe in array
-                        for item in data:
-                            if isinstance(item, dict) and (item.get('@type') == 'Recipe' or 'Recipe' in str(item.get('@type', ''))):
-                                recipe_data = item
-                                break
-                    elif isinstance(data, dict):
-                        if data.get('@type') == 'Recipe' or 'Recipe' in str(data.get('@type', '')):
-                            recipe_data = data
-                        elif '@graph' in data:
-                            # Handle nested @graph structure
-                            for item in data['@graph']:
-                                if isinstance(item, dict) and (item.get('@type') == 'Recipe' or 'Recipe' in str(item.get('@type', ''))):
-                                    recipe_data = item
-                                    break
-                    
-                    if recipe_data:
-                        break
-                except json.JSONDecodeError:
-                    continue
-                except Exception as e:
-                    print(f"Error parsing JSON-LD: {str(e)}")
-            
-            if recipe_data:
-                return self.parse_structured_recipe(recipe_data, url)
-            else:
-                return self.parse_html_recipe(soup, url)
-        except Exception as e:
-            raise Exception(f"Failed to extract recipe: {str(e)}")
-
-    def parse_structured_recipe(self, data, url):
-        recipe = {
-            'url': url,
-            'title': 'Untitled Recipe',
-            'description': '',
-            'prep_time': '',
-            'cook_time': '',
-            'total_time': '',
-            'servings': '',
-            'ingredients': [],
-            'instructions': [],
-            'image_url': None
-        }
-        
-        # Handle nested @graph structure and find Recipe schema
-        recipe_data = None
-        
-        def find_recipe_data(obj):
-            if isinstance(obj, dict):
-                # Check if this object is a Recipe
-                if obj.get('@type') == 'Recipe' or (isinstance(obj.get('@type'), list) and 'Recipe' in obj['@type']):
-                    return obj
-                # Check @graph
-                if '@graph' in obj:
-                    for item in obj['@graph']:
-                        found = find_recipe_data(item)
-                        if found:
-                            return found
-                # Check each value
-                for value in obj.values():
-                    found = find_recipe_data(value)
-                    if found:
-                        return found
-            elif isinstance(obj, list):
-                for item in obj:
-                    found = find_recipe_data(item)
-                    if found:
-                        return found
-            return None
-        
-        recipe_data = find_recipe_data(data)
-        if recipe_data:
-            data = recipe_data
-        
-        # Basic recipe metadata
-        recipe['title'] = data.get('name', data.get('headline', 'Untitled Recipe'))
-        recipe['description'] = data.get('description', '')
-        recipe['servings'] = str(data.get('recipeYield', data.get('yield', '')))
-        
-        # Time information
-        recipe['prep_time'] = self.extract_time(data.get('prepTime', ''))
-        recipe['cook_time'] = self.extract_time(data.get('cookTime', ''))
-        recipe['total_time'] = self.extract_time(data.get('totalTime', ''))
-        
-        # Handle ingredients - multiple possible property names
-        raw_ingredients = []
-        for key in ['recipeIngredient', 'ingredients', 'recipeIngredients']:
-            if key in data:
-                raw_ingredients = data[key]
-                break
-        
-        if isinstance(raw_ingredients, str):
-            # Split by newlines if it's a single string
-            raw_ingredients = [ing.strip() for ing in raw_ingredients.split('\n')]
-        elif isinstance(raw_ingredients, dict):
-            # Some sites nest ingredients in an object
-            raw_ingredients = [str(ing) for ing in raw_ingredients.values()]
-            
-        recipe['ingredients'] = [ing.strip() for ing in raw_ingredients if ing and ing.strip()]
-        
-        # Handle instructions - multiple possible formats
-        raw_instructions = data.get('recipeInstructions', data.get('instructions', []))
-        instructions = []
-        
-        def extract_instruction_text(inst):
-            if isinstance(inst, dict):
-                # HowToStep format
-                if 'text' in inst:
-                    return inst['text']
-                # HowToSection format
-                elif 'itemListElement' in inst:
-                    steps = []
-                    if isinstance(inst.get('name'), str):
-                        steps.append(f"== {inst['name']} ==")
-                    items = inst['itemListElement']
-                    if isinstance(items, list):
-                        for item in items:
-                            extracted = extract_instruction_text(item)
-                            if isinstance(extracted, list):
-                                steps.extend(extracted)
-                            elif extracted:
-                                steps.append(extracted)
-                    return steps
-                # Some sites use 'step' instead of 'text'
-                elif 'step' in inst:
-                    return inst['step']
-            elif isinstance(inst, str):
-                return inst
-            return None
-        
-        if isinstance(raw_instructions, str):
-            # Split by newlines or numbers if it's a single string
-            steps = re.split(r'\n+|\d+\.\s*|\d+\)\s*', raw_instructions)
-            instructions = [step.strip() for step in steps if step.strip()]
+        self.fetch_slots = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self.host_slots = {}
+        self.host_next_request = {}
+        # HTTP/2 lets every page from the same site share one multiplexed connection
+        limits = httpx.Limits(max_connections=MAX_CONCURRENT_FETCHES, max_keepalive_connections=MAX_CONCURRENT_FETCHES)
+        # Parsing is pure Python, so big batches spread it over processes to use every core.
+        # Each spawned worker is a fresh interpreter that re-runs this script as __mp_main__
+        # (PyQt6 included) before it can parse, so small batches parse on the loop's default
+        # thread pool instead (nullcontext gives run_in_executor None).
+        # Spawn rather than fork, forking a process with Qt and other threads running isn't safe
+        if total_urls >= PARSE_POOL_MIN_URLS:
+            parse_pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, total_urls),
+                                             mp_context=multiprocessing.get_context('spawn'))
         else:
-            for inst in raw_instructions:
-                extracted = extract_instruction_text(inst)
-                if isinstance(extracted, list):
-                    instructions.extend([text.strip() for text in extracted if text and text.strip()])
-                elif extracted:
-                    instructions.append(extracted.strip())
-        
-        recipe['instructions'] = instructions
-        
-        # Extract image - handle multiple formats
-        image = data.get('image', data.get('images', data.get('thumbnailUrl')))
-        if image:
-            if isinstance(image, list):
-                # Get the first image
-                image = image[0]
-            if isinstance(image, dict):
-                # Prefer full-size image if available
-                recipe['image_url'] = image.get('url', image.get('contentUrl'))
-            elif isinstance(image, str):
-                recipe['image_url'] = image
-        
-        return recipe
+            parse_pool = nullcontext()
+        with parse_pool as self.parse_pool:
+            async with httpx.AsyncClient(http2=True, headers=REQUEST_HEADERS, limits=limits,
+                                         timeout=10, follow_redirects=True) as client:
+                tasks = [asyncio.ensure_future(self.extract_with_retries(client, url)) for url in urls]
+                # Hand each recipe to the UI as soon as it is ready
+                for done, task in enumerate(asyncio.as_completed(tasks), 1):
+                    recipe = await task
+                    if recipe:
+                        self.recipes.append(recipe)
+                        self.recipe_extracted.emit(recipe)
+                    self.status_updated.emit(f"Processed {done} of {total_urls} recipes...")
+                    self.progress_updated.emit(int(done / total_urls * 100))
 
-    def parse_html_recipe(self, soup, url):
-        recipe = {
-            'url': url,
-            'title': 'Untitled Recipe',
-            'description': '',
-            'prep_time': '',
-            'cook_time': '',
-            'total_time': '',
-            'servings': '',
-            'ingredients': [],
-            'instructions': [],
-            'image_url': None
-        }
-        
-        # Try to find title
-        title_selectors = ['h1', '.recipe-title', '.entry-title', 'title']
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                recipe['title'] = title_elem.get_text().strip()
-                break
-        
-        # Try to find ingredients
-        ingredient_selectors = [
-            'ul.ingredients li', '.recipe-ingredients li', '.ingredients li',
-            '[itemprop="recipeIngredient"]', '.ingredient-list li',
-            '.wprm-recipe-ingredient', '.ingredient', '[class*="ingredient"]',
-            '.tasty-recipes-ingredients li', '.recipe-ingred_str', '.ERSIngredients li',
-            '.wpurp-recipe-ingredient', '[class*="ingredient-list"] li'
-        ]
-        
-        for selector in ingredient_selectors:
-            ingredients = soup.select(selector)
-            if ingredients:
-                recipe['ingredients'] = [ing.get_text().strip() for ing in ingredients if ing.get_text().strip()]
-                if recipe['ingredients']:  # If we found valid ingredients, break
-                    break
-        
-        # If no ingredients found, try finding a container and get text or lists within
-        if not recipe['ingredients']:
-            container_selectors = ['.ingredients', '.recipe-ingredients', '[itemprop="recipeIngredient"]']
-            for selector in container_selectors:
-                container = soup.select_one(selector)
-                if container:
-                    # Try to find lists within container
-                    lists = container.find_all(['ul', 'ol'])
-                    if lists:
-                        for list_elem in lists:
-                            items = list_elem.find_all('li')
-                            if items:
-                                recipe['ingredients'].extend([item.get_text().strip() for item in items if item.get_text().strip()])
-                    # If no lists found, try to split text by newlines
-                    elif container.get_text().strip():
-                        text = container.get_text().strip()
-                        items = [line.strip() for line in text.split('\n') if line.strip()]
-                        recipe['ingredients'].extend(items)
-                    if recipe['ingredients']:
-                        break
-        
-        # Try to find instructions
-        instruction_selectors = [
-            'ol.instructions li', '.recipe-instructions li', '.recipe-directions li',
-            '[itemprop="recipeInstructions"] li', '.instruction-list li',
-            '.wprm-recipe-instruction', '.preparation-step', '.recipe-method-step',
-            '.tasty-recipes-instructions li', '.ERSInstructions li', '.recipe-steps li',
-            '.wpurp-recipe-instruction', '[class*="instruction-list"] li'
-        ]
-        
-        for selector in instruction_selectors:
-            instructions = soup.select(selector)
-            if instructions:
-                recipe['instructions'] = [inst.get_text().strip() for inst in instructions if inst.get_text().strip()]
-                break
-        
-        # If no structured instructions found, try finding paragraphs within instruction containers
-        if not recipe['instructions']:
-            container_selectors = [
-                '.recipe-instructions', '.recipe-directions', '.instructions',
-                '[itemprop="recipeInstructions"]', '.method-steps', '.recipe-method',
-                '.wprm-recipe-instructions', '.tasty-recipes-instructions',
-                '.ERSInstructions', '.wpurp-recipe-instructions', '.recipe__method-steps',
-                '.RecipeInstructions', '[class*="recipe-steps"]', '[class*="cooking-steps"]',
-                '[class*="method-steps"]'
-            ]
-            for selector in container_selectors:
-                container = soup.select_one(selector)
-                if container:
-                    paragraphs = container.find_all(['p', 'li'])
-                    if paragraphs:
-                        recipe['instructions'] = [p.get_text().strip() for p in paragraphs if p.get_text().strip()]
-                        break
-        
-        # Try to find image
-        img_selectors = [
-            '.recipe-image img', '.recipe-photo img', '[class*="recipe"] img',
-            'img[itemprop="image"]', '.hero-photo img'
-        ]
-        for selector in img_selectors:
-            img = soup.select_one(selector)
-            if img and img.get('src'):
-                recipe['image_url'] = urljoin(url, img['src'])
-                break
+    async def extract_with_retries(self, client, url):
+        retry_delay = 3  # Initial delay between retries in seconds
+        max_retries = 2  # Maximum number of retries per URL
         
+        for attempt in range(max_retries + 1):
+            try:
+                recipe = await self.extract_recipe(client, url)
+                if recipe and recipe.get('ingredients') and recipe.get('instructions'):
+                    return recipe
+                if attempt == max_retries:
+                    self.error_occurred.emit(f"Couldn't extract complete recipe from {url} after {max_retries + 1} attempts")
+                    return None
+                self.status_updated.emit(f"Retrying {url} in {retry_delay} seconds...")
+            except Exception as e:
+                if attempt == max_retries:
+                    self.error_occurred.emit(f"Error extracting from {url} after {max_retries + 1} attempts: {str(e)}")
+                    return None
+                self.status_updated.emit(f"Error occurred, retrying {url} in {retry_delay} seconds...")
+            await asyncio.sleep(retry_delay)
+            retry_delay *= 2  # Exponential backoff
+
+    async def extract_recipe(self, client, url):
+        print(f"\nAttempting to extract recipe from: {url}")
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        html = await loop.run_in_executor(None, load_cached_page, url)
+        cached = html is not None
+        if cached:
+            print("Using cached page")
+        else:
+            host_slots = self.host_slots.setdefault(host, asyncio.Semaphore(MAX_FETCHES_PER_HOST))
+            async with host_slots:
+                # Wait our turn for the site before taking one of the shared fetch slots
+                await self.wait_for_host(host)
+                async with self.fetch_slots:
+                    try:
+                        async with client.stream('GET', url) as response:
+                            response.raise_for_status()
+                            html = await self.read_page(response)
+                    except Exception as e:
+                        raise Exception(f"Failed to extract recipe: {str(e)}")
+
+        # Parse in a worker process so other downloads, and other pages, keep going meanwhile
+        recipe, scrapers_supported = await loop.run_in_executor(
+            self.parse_pool, parse_recipe_page, url, html, host not in self.unsupported_hosts)
+        if not scrapers_supported:
+            # Send the rest of this site's pages straight to our own parser
+            self.unsupported_hosts.add(host)
+        if not cached and recipe and recipe.get('ingredients') and recipe.get('instructions'):
+            await loop.run_in_executor(None, save_cached_page, url, html)
         return recipe
 
-    def extract_time(self, time_str):
-        if not time_str:
-            return ''
-        # Handle ISO 8601 duration format (PT30M)
-        if time_str.startswith('PT'):
-            match = re.search(r'PT(?:(\d+)H)?(?:(\d+)M)?', time_str)
-            if match:
-                hours = int(match.group(1) or 0)
-                minutes = int(match.group(2) or 0)
-                if hours and minutes:
-                    return f"{hours}h {minutes}m"
-                elif hours:
-                    return f"{hours}h"
-                elif minutes:
-                    return f"{minutes}m"
-        return str(time_str)
+    async def wait_for_host(self, host):
+        """Space out requests to the same site so a big batch from one blog doesn't get rate limited"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self.host_next_request.get(host, now))
+        self.host_next_request[host] = start + HOST_REQUEST_INTERVAL
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def read_page(self, response):
+        """Read an HTML body chunk by chunk, giving up early on non-HTML or oversized pages"""
+        content_type = response.headers.get('content-type', '').lower()
+        if content_type and not content_type.startswith(HTML_CONTENT_TYPES):
+            raise Exception(f"Not an HTML page ({content_type})")
+        content_length = response.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > MAX_PAGE_BYTES:
+            raise Exception(f"Page is larger than {MAX_PAGE_BYTES // (1024 * 1024)} MB")
+
+        body = bytearray()
+        async for chunk in response.aiter_bytes(64 * 1024):
+            body += chunk
+            if len(body) > MAX_PAGE_BYTES:
+                raise Exception(f"Page is larger than {MAX_PAGE_BYTES // (1024 * 1024)} MB")
+        return decode_html(bytes(body), response.charset_encoding)
+
+# Stylesheet shared by every chapter of the generated book
+EPUB_CSS = """
+@page {
+    margin: 30px;
+}
+body { 
+    font-family: "Bookerly", "Georgia", serif; 
+    margin: 0 auto;
+    line-height: 1.7;
+    max-width: 800px;
+    padding: 20px;
+    color: #2c3338;
+}
+h1 { 
+    color: #1a1d1e;
+    border-bottom: 2px solid #7ed957;
+    font-size: 28px;
+    margin: 40px 0 30px;
+    padding-bottom: 10px;
+    text-align: center;
+    font-weight: 700;
+    letter-spacing: -0.02em;
+}
+h2 { 
+    color: #2c3338;
+    margin: 35px 0 20px;
+    font-size: 22px;
+    font-weight: 600;
+    letter-spacing: -0.01em;
+}
+p {
+    margin: 1.2em 0;
+}
+.recipe-meta { 
+    background: #f8faf7;
+    padding: 20px;
+    margin: 25px 0;
+    border-radius: 12px;
+    border: 1px solid #e8f3e5;
+    font-size: 0.95em;
+    color: #4a5056;
+    text-align: center;
+    font-family: "Segoe UI", sans-serif;
+}
+.ingredients { 
+    background: #f8faf7;
+    padding: 25px 35px;
+    margin: 25px 0;
+    border-radius: 12px;
+    border: 1px solid #e8f3e5;
+}
+.ingredients ul {
+    margin: 0;
+    padding: 0;
+    list-style-position: inside;
+}
+.ingredients li {
+    margin: 10px 0;
+    line-height: 1.5;
+}
+.instructions { 
+    margin: 30px 0;
+}
+.instructions ol {
+    margin: 0;
+    padding: 0;
+    list-style-position: inside;
+    counter-reset: recipe-steps;
+}
+.instruction { 
+    margin: 20px 0;
+    padding: 20px 25px;
+    background: #f8faf7;
+    border-radius: 12px;
+    border: 1px solid #e8f3e5;
+    position: relative;
+}
+img { 
+    display: block;
+    max-width: 100%;
+    height: auto;
+    border-radius: 12px;
+    margin: 30px auto;
+    box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
+}
+a {
+    color: #2d7d1e;
+    text-decoration: none;
+}
+a:hover {
+    text-decoration: underline;
+}
+"""
+
+class ImageStoringEpubWriter(epub.EpubWriter):
+    """EpubWriter that stores images as-is instead of deflating already-compressed bytes again"""
+
+    STORED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+    def _write_items(self):
+        # ebooklib has no per-item compression option, so pick it as each entry is written
+        write = self.out.writestr
+
+        def writestr(name, data, *args, **kwargs):
+            if str(name).lower().endswith(self.STORED_EXTENSIONS):
+                kwargs['compress_type'] = zipfile.ZIP_STORED
+            return write(name, data, *args, **kwargs)
+
+        self.out.writestr = writestr
+        try:
+            super()._write_items()
+        finally:
+            del self.out.writestr
 
 class EpubGenerator(QThread):
     progress_updated = pyqtSignal(int)
@@ -487,10 +428,17 @@ class EpubGenerator(QThread):
         self.book_title = book_title
 
     def run(self):
+        # Created here, on the generator thread, rather than on the GUI thread in __init__
+        self.session = create_session()
+        self.image_executor = ThreadPoolExecutor(max_workers=16)
         try:
             self.generate_epub()
         except Exception as e:
             self.error_occurred.emit(f"Error generating EPUB: {str(e)}")
+        finally:
+            # Drop queued downloads and let running ones finish before their client goes away
+            self.image_executor.shutdown(wait=True, cancel_futures=True)
+            self.session.close()
 
     def generate_epub(self):
         book = epub.EpubBook()
@@ -506,207 +454,161 @@ class EpubGenerator(QThread):
         # Initialize all recipes list
         all_recipes = [recipe for recipes in self.categorized_recipes.values() for recipe in recipes]
 
-        # Create temporary directory for images
-        temp_dir = tempfile.mkdtemp()
-        try:
-            chapter_num = 0
-            total_recipes = sum(len(recipes) for recipes in self.categorized_recipes.values())
-            recipes_processed = 0
-
-            # Create category sections
-            for category, recipes in self.categorized_recipes.items():
-                # Category section
-                cat_id = f'category_{category.lower().replace(" ", "_")}'
-                category_content = f'<h1>{category}</h1>'
-                category_chapter = epub.EpubHtml(
-                    title=category,
-                    file_name=f'{cat_id}.xhtml',
-                    content=category_content
-                )
-                book.add_item(category_chapter)
-                chapters.append(category_chapter)
-                spine.append(category_chapter)
-
-                # Category recipes
-                category_chapters = []
-                for recipe in recipes:
-                    chapter_content = self.create_chapter_content(recipe, temp_dir, book)
-                    chapter_id = f'chapter_{chapter_num}'
-                    
-                    chapter = epub.EpubHtml(
-                        title=recipe['title'],
-                        content=chapter_content,
-                        file_name=f'{chapter_id}.xhtml'
-                    )
-                    
-                    book.add_item(chapter)
-                    chapters.append(chapter)
-                    category_chapters.append((epub.Link(f'{chapter_id}.xhtml', recipe['title'], chapter_id)))
-                    spine.append(chapter)
-                    
-                    chapter_num += 1
-                    recipes_processed += 1
-                    self.progress_updated.emit(int(recipes_processed / total_recipes * 100))
-
-                # Add category to table of contents
-                toc.append((category_chapter, category_chapters))
-
-            # Add CSS
-            css = """
-            @page {
-                margin: 30px;
-            }
-            body { 
-                font-family: "Bookerly", "Georgia", serif; 
-                margin: 0 auto;
-                line-height: 1.7;
-                max-width: 800px;
-                padding: 20px;
-                color: #2c3338;
-            }
-            h1 { 
-                color: #1a1d1e;
-                border-bottom: 2px solid #7ed957;
-                font-size: 28px;
-                margin: 40px 0 30px;
-                padding-bottom: 10px;
-                text-align: center;
-                font-weight: 700;
-                letter-spacing: -0.02em;
-            }
-            h2 { 
-                color: #2c3338;
-                margin: 35px 0 20px;
-                font-size: 22px;
-                font-weight: 600;
-                letter-spacing: -0.01em;
-            }
-            p {
-                margin: 1.2em 0;
-            }
-            .recipe-meta { 
-                background: #f8faf7;
-                padding: 20px;
-                margin: 25px 0;
-                border-radius: 12px;
-                border: 1px solid #e8f3e5;
-                font-size: 0.95em;
-                color: #4a5056;
-                text-align: center;
-                font-family: "Segoe UI", sans-serif;
-            }
-            .ingredients { 
-                background: #f8faf7;
-                padding: 25px 35px;
-                margin: 25px 0;
-                border-radius: 12px;
-                border: 1px solid #e8f3e5;
-            }
-            .ingredients ul {
-                margin: 0;
-                padding: 0;
-                list-style-position: inside;
-            }
-            .ingredients li {
-                margin: 10px 0;
-                line-height: 1.5;
-            }
-            .instructions { 
-                margin: 30px 0;
-            }
-            .instructions ol {
-                margin: 0;
-                padding: 0;
-                list-style-position: inside;
-                counter-reset: recipe-steps;
-            }
-            .instruction { 
-                margin: 20px 0;
-                padding: 20px 25px;
-                background: #f8faf7;
-                border-radius: 12px;
-                border: 1px solid #e8f3e5;
-                position: relative;
-            }
-            img { 
-                display: block;
-                max-width: 100%;
-                height: auto;
-                border-radius: 12px;
-                margin: 30px auto;
-                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-            }
-            a {
-                color: #2d7d1e;
-                text-decoration: none;
-            }
-            a:hover {
-                text-decoration: underline;
-            }
-            """
-            
-            nav_css = epub.EpubItem(
-                uid="nav_css",
-                file_name="style/nav.css",
-                media_type="text/css",
-                content=css
+        # Start every image download now, chapters pick them up as they are built
+        images = self.download_images(recipe.get('image_url') for recipe in all_recipes)
+        image_files = {}  # Image url or content digest -> file already embedded in the book
+
+        chapter_num = 0
+        total_recipes = sum(len(recipes) for recipes in self.categorized_recipes.values())
+        recipes_processed = 0
+
+        # Create category sections
+        for category, recipes in self.categorized_recipes.items():
+            # Category section
+            cat_id = f'category_{category.lower().replace(" ", "_")}'
+            category_content = f'<h1>{category}</h1>'
+            category_chapter = epub.EpubHtml(
+                title=category,
+                file_name=f'{cat_id}.xhtml',
+                content=category_content
             )
-            book.add_item(nav_css)
+            book.add_item(category_chapter)
+            chapters.append(category_chapter)
+            spine.append(category_chapter)
+
+            # Category recipes
+            category_chapters = []
+            for recipe in recipes:
+                chapter_content = self.create_chapter_content(recipe, book, images, image_files)
+                chapter_id = f'chapter_{chapter_num}'
+                
+                chapter = epub.EpubHtml(
+                    title=recipe['title'],
+                    content=chapter_content,
+                    file_name=f'{chapter_id}.xhtml'
+                )
+                
+                book.add_item(chapter)
+                chapters.append(chapter)
+                category_chapters.append((epub.Link(f'{chapter_id}.xhtml', recipe['title'], chapter_id)))
+                spine.append(chapter)
+                
+                chapter_num += 1
+                recipes_processed += 1
+                self.progress_updated.emit(int(recipes_processed / total_recipes * 100))
+
+            # Add category to table of contents
+            toc.append((category_chapter, category_chapters))
+
+        # Add CSS
+        nav_css = epub.EpubItem(
+            uid="nav_css",
+            file_name="style/nav.css",
+            media_type="text/css",
+            content=EPUB_CSS
+        )
+        book.add_item(nav_css)
 
-            # Set table of contents
-            book.toc = toc
+        # Set table of contents
+        book.toc = toc
 
-            # Add navigation files
-            book.add_item(epub.EpubNcx())
-            book.add_item(epub.EpubNav())
+        # Add navigation files
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
 
-            book.spine = spine
+        book.spine = spine
 
-            # Write EPUB
-            epub.write_epub(self.output_path, book)
-            self.generation_complete.emit(self.output_path)
-            
-        finally:
-            # Clean up temporary directory
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        # Write EPUB
+        # Chapters are tiny, deflating them harder than level 1 saves next to nothing
+        writer = ImageStoringEpubWriter(self.output_path, book, {'compresslevel': 1})
+        writer.process()
+        writer.write()
+        self.generation_complete.emit(self.output_path)
+
+    def download_image(self, url):
+        try:
+            for attempt in range(IMAGE_RETRIES + 1):
+                # Stream the body so a huge file can be dropped before it is all in memory
+                with self.session.stream('GET', url) as response:
+                    if response.status_code in IMAGE_RETRY_STATUSES and attempt < IMAGE_RETRIES:
+                        # Rate limited or a flaky CDN, wait as asked (or back off) and try again
+                        delay = parse_retry_after(response.headers.get('retry-after'))
+                        if delay is None:
+                            delay = IMAGE_RETRY_BACKOFF * 2 ** attempt
+                        if delay > MAX_IMAGE_RETRY_WAIT:
+                            return None
+                    elif response.status_code != 200:
+                        return None
+                    else:
+                        content_type = response.headers.get('content-type', '')
+                        declared_length = response.headers.get('content-length', '')
+                        if declared_length.isdigit() and int(declared_length) > MAX_IMAGE_BYTES:
+                            raise ValueError(f"image is larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+                        data = bytearray()
+                        for chunk in response.iter_bytes(64 * 1024):
+                            data += chunk
+                            if len(data) > MAX_IMAGE_BYTES:
+                                raise ValueError(f"image is larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+                        data = bytes(data)
+                        break
+                # Sleep after the response is closed so its connection goes back to the pool
+                time.sleep(delay)
+        except Exception as e:
+            print(f"Failed to download image {url}: {e}")
+            return None  # Skip image if download fails
 
-    def create_chapter_content(self, recipe, temp_dir, book):
-        content = f'<html><head><title>{recipe["title"]}</title></head><body>'
-        content += f'<h1>{recipe["title"]}</h1>'
+        # Shrink big photos here, on the download thread, so it runs in parallel too
+        try:
+            shrunk = shrink_image(data)
+            if shrunk:
+                return shrunk, 'image/jpeg'
+        except Exception as e:
+            print(f"Failed to resize image {url}, embedding it as-is: {e}")
+        return data, content_type
+
+    def download_images(self, image_urls):
+        """Start downloading images in the background, returning a dict of url -> future (content, content_type)"""
+        # The fragment never changes what the server sends back
+        urls = dict.fromkeys(urldefrag(url).url for url in image_urls if url)
+        return {url: self.image_executor.submit(self.download_image, url) for url in urls}
+
+    def create_chapter_content(self, recipe, book, images, image_files):
+        # Scraped text is plain text, escape it once so stray '&' or '<' can't break the XHTML
+        title = escape(recipe['title'])
+        parts = [f'<html><head><title>{title}</title></head><body>', f'<h1>{title}</h1>']
         
         if recipe.get('description'):
-            content += f'<p><em>{recipe["description"]}</em></p>'
+            parts.append(f'<p><em>{escape(recipe["description"])}</em></p>')
+        
+        # Add image if available, embedding each distinct image only once
+        image_url = urldefrag(recipe['image_url']).url if recipe.get('image_url') else None
+        img_filename = image_files.get(image_url)
+        # Only blocks if this recipe's image is still downloading
+        image = images[image_url].result() if image_url in images else None
+        if image and not img_filename:
+            image_data, content_type = image
+            # The same picture is often served from several URLs (CDN variants, mirrors)
+            digest = hashlib.sha1(image_data).hexdigest()[:12]
+            img_filename = image_files.get(digest)
+            if not img_filename:
+                media_type = image_media_type(image_data, content_type)
+                ext = IMAGE_EXTENSIONS[media_type]
+                
+                img_filename = f'recipe_image_{digest}.{ext}'
+                
+                # Add image to book
+                img_item = epub.EpubItem(
+                    uid=f"img_{digest}",
+                    file_name=f"images/{img_filename}",
+                    media_type=media_type,
+                    content=image_data
+                )
+                book.add_item(img_item)
+                image_files[digest] = img_filename
+            image_files[image_url] = img_filename
         
-        # Add image if available
-        if recipe.get('image_url'):
-            try:
-                img_response = requests.get(recipe['image_url'], timeout=10)
-                if img_response.status_code == 200:
-                    # Determine image extension
-                    content_type = img_response.headers.get('content-type', '')
-                    if 'jpeg' in content_type or 'jpg' in content_type:
-                        ext = 'jpg'
-                    elif 'png' in content_type:
-                        ext = 'png'
-                    elif 'gif' in content_type:
-                        ext = 'gif'
-                    else:
-                        ext = 'jpg'  # default
-                    
-                    img_filename = f'recipe_image_{len(book.items)}.{ext}'
-                    
-                    # Add image to book
-                    img_item = epub.EpubItem(
-                        uid=f"img_{len(book.items)}",
-                        file_name=f"images/{img_filename}",
-                        media_type=f"image/{ext}",
-                        content=img_response.content
-                    )
-                    book.add_item(img_item)
-                    
-                    content += f'<img src="images/{img_filename}" alt="{recipe["title"]}" style="max-width: 100%; height: auto;"/><br/><br/>'
-            except:
-                pass  # Skip image if download fails
+        if img_filename:
+            parts.append(f'<img src="images/{img_filename}" alt="{title}" style="max-width: 100%; height: auto;"/><br/><br/>')
         
         # Recipe metadata
         meta_items = []
@@ -720,61 +622,79 @@ class EpubGenerator(QThread):
             meta_items.append(f"Servings: {recipe['servings']}")
         
         if meta_items:
-            content += '<div class="recipe-meta">' + ' | '.join(meta_items) + '</div>'
+            parts.append('<div class="recipe-meta">' + escape(' | '.join(meta_items)) + '</div>')
         
         # Ingredients
         if recipe.get('ingredients'):
-            content += '<h2>Ingredients</h2><div class="ingredients"><ul>'
-            for ingredient in recipe['ingredients']:
-                content += f'<li>{ingredient}</li>'
-            content += '</ul></div>'
+            parts.append('<h2>Ingredients</h2><div class="ingredients"><ul>')
+            parts.extend(f'<li>{escape(ingredient)}</li>' for ingredient in recipe['ingredients'])
+            parts.append('</ul></div>')
         
         # Instructions
         if recipe.get('instructions'):
-            content += '<h2>Instructions</h2><div class="instructions"><ol>'
-            for i, instruction in enumerate(recipe['instructions'], 1):
-                content += f'<li class="instruction">{instruction}</li>'
-            content += '</ol></div>'
+            parts.append('<h2>Instructions</h2><div class="instructions"><ol>')
+            parts.extend(f'<li class="instruction">{escape(instruction)}</li>' for instruction in recipe['instructions'])
+            parts.append('</ol></div>')
         
-        content += f'<br/><p><small>Source: <a href="{recipe["url"]}">{recipe["url"]}</a></small></p>'
-        content += '</body></html>'
+        source_url = escape(recipe['url'])
+        parts.append(f'<br/><p><small>Source: <a href="{source_url}">{source_url}</a></small></p>')
+        parts.append('</body></html>')
         
-        return content
+        return ''.join(parts)
 
     def create_cover_collage(self, image_urls):
         """Create an attractive collage for the book cover"""
+        def grid(n):
+            # Determine grid dimensions
+            if n <= 2:
+                return 1, n
+            return 2, (n + 1) // 2
+
         try:
-            # Download and verify images
-            images = []
-            for url in image_urls:
+            # Download all images at once on the image pool, then verify them in order
+            candidates = []
+            for url, future in self.download_images(image_urls).items():
+                downloaded = future.result()
+                if not downloaded:
+                    continue
                 try:
-                    response = requests.get(url, timeout=10)
-                    if response.status_code == 200:
-                        img = Image.open(BytesIO(response.content)).convert("RGB")
-                        images.append(img)
+                    # Only the header is read here, decoding waits until the cell size is known.
+                    # download_image re-encodes anything else as JPEG, so only probe these formats
+                    candidates.append((url, Image.open(BytesIO(downloaded[0]), formats=EPUB_IMAGE_FORMATS)))
                 except Exception as e:
                     print(f"Failed to load image {url}: {e}")
                     continue
 
-            if not images:
+            if not candidates:
                 return None
 
-            # Calculate optimal layout
-            n = len(images)
-            if n > 6:  # Limit to 6 images for better appearance
-                images = images[:6]
-                n = 6
-
-            # Determine grid dimensions
-            if n <= 2:
-                cols, rows = 1, n
-            elif n <= 6:
-                cols = 2
-                rows = (n + 1) // 2
-
             # Target size for cover (portrait orientation)
             target_width = 1200
             target_height = 1600
+
+            # Decode up to 6 images (for better appearance), one at a time so a corrupt
+            # or truncated image is skipped on its own instead of losing the whole cover
+            cols, rows = grid(min(len(candidates), 6))
+            images = []
+            for url, img in candidates:
+                if len(images) == 6:
+                    break
+                try:
+                    # Let libjpeg decode at the nearest scale above the cell size instead of at full resolution
+                    img.draft('RGB', (target_width // cols, target_height // rows))
+                    if img.mode != 'RGB':
+                        img = img.convert('RGB')
+                    img.load()
+                    images.append(img)
+                except Exception as e:
+                    print(f"Failed to load image {url}: {e}")
+                    continue
+
+            if not images:
+                return None
+
+            # Calculate optimal layout (cells only grow if an image was skipped above)
+            cols, rows = grid(len(images))
             thumb_width = target_width // cols
             thumb_height = target_height // rows
 
@@ -792,8 +712,8 @@ class EpubGenerator(QThread):
                     new_height = thumb_height
                     new_width = int(thumb_height * aspect)
 
-                # Resize image
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                # Resize image, box-reducing big photos first so LANCZOS only runs on the last 2x
+                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=2.0)
 
                 # Calculate position (centered in grid cell)
                 row = idx // cols
@@ -804,15 +724,29 @@ class EpubGenerator(QThread):
                 # Paste image
                 collage.paste(img, (x, y))
 
-            # Save collage with good quality
+            # Save collage with good quality, in a single baseline pass (a cover gains nothing from optimize/progressive)
             with BytesIO() as output:
-                collage.save(output, format="JPEG", quality=85)
+                collage.save(output, format="JPEG", quality=85, subsampling=2, optimize=False, progressive=False)
                 return output.getvalue()
 
         except Exception as e:
             print(f"Failed to create cover collage: {e}")
             return None
 
+# Row button icons, drawn in the current accent color
+EDIT_ICON_SVGS = {
+    'edit': '''
+        <svg viewBox="0 0 24 24" width="16" height="16">
+            <path fill="#7ed957" d="M3 17.25V21h3.75L17.81 9.94l-3.75-3.75L3 17.25zM20.71 7.04c.39-.39.39-1.02 0-1.41l-2.34-2.34c-.39-.39-1.02-.39-1.41 0l-1.83 1.83 3.75 3.75 1.83-1.83z"/>
+        </svg>
+    ''',
+    'category': '''
+        <svg viewBox="0 0 24 24" width="16" height="16">
+            <path fill="#7ed957" d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 10-10S17.52 2 12 2zm0 18c-4.41 0-8-3.59-8-8s3.59-8 8-8 8 3.59 8 8-3.59 8-8 8zm-1-11h2v3h3v2h-3v3h-2v-3H8v-2h3V9z"/>
+        </svg>
+    '''
+}
+
 class InlineEditDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, index):
         return QLineEdit(parent)
@@ -829,6 +763,18 @@ class RecipeConverter(QMainWindow):
         self.recipe_edits = {}  # {index: {'title': ..., 'category': ...}}
         self.recipe_rows = []
         self.selected_row = None
+        # Recipes arriving from the extractor are added to the list in batches
+        self.pending_recipes = []
+        self.pending_timer = QTimer(self)
+        self.pending_timer.setInterval(100)
+        self.pending_timer.setSingleShot(True)
+        self.pending_timer.timeout.connect(self.flush_pending_recipes)
+        # Every row shares the same two icons, so render each SVG only once
+        self.edit_icons = {}
+        for icon_name, svg_data in EDIT_ICON_SVGS.items():
+            pixmap = QPixmap()
+            pixmap.loadFromData(svg_data.encode('utf-8'))
+            self.edit_icons[icon_name] = QIcon(pixmap)
         self.init_ui()
         self.load_previous_links()
 
@@ -1027,15 +973,17 @@ class RecipeConverter(QMainWindow):
     def load_previous_links(self):
         if os.path.exists(self.md_file_path):
             try:
-                with open(self.md_file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Extract URLs from markdown
-                    urls = re.findall(r'- \[.*?\]\((.*?)\)', content)
-                    if urls:
-                        self.url_input.setText('\n'.join(urls))
-                        self.status_label.setText(f"Loaded {len(urls)} URLs from previous session")
-                    else:
-                        self.status_label.setText("No URLs found in previous session")
+                urls = []
+                # Scan the mapped file directly, no need to read and decode all of it
+                if os.path.getsize(self.md_file_path):
+                    with open(self.md_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        # Extract URLs from markdown
+                        urls = [url.decode('utf-8') for url in MARKDOWN_LINK_RE.findall(mm)]
+                if urls:
+                    self.url_input.setText('\n'.join(urls))
+                    self.status_label.setText(f"Loaded {len(urls)} URLs from previous session")
+                else:
+                    self.status_label.setText("No URLs found in previous session")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not load previous links: {str(e)}")
 
@@ -1047,9 +995,13 @@ class RecipeConverter(QMainWindow):
             return
         
         # Clear previous recipes
+        self.pending_timer.stop()
+        self.pending_recipes = []
         self.recipes = []
         for row in self.recipe_rows:
             row.setParent(None)
+            # The edit buttons' slots hold the row, so only deleting it on the Qt side frees it
+            row.deleteLater()
         self.recipe_rows = []
         self.recipe_edits = {}
         
@@ -1068,33 +1020,18 @@ class RecipeConverter(QMainWindow):
 
     def detect_category(self, recipe):
         """Automatically detect recipe category based on title and ingredients"""
-        title = recipe['title'].lower()
-        ingredients = [ing.lower() for ing in recipe.get('ingredients', [])]
-        
-        # Define category patterns
-        patterns = {
-            'Dessert': ['cake', 'cookie', 'pie', 'dessert', 'sweet', 'chocolate', 'ice cream', 'pudding'],
-            'Breakfast': ['breakfast', 'pancake', 'waffle', 'eggs', 'omelette', 'oatmeal', 'cereal'],
-            'Appetizer': ['appetizer', 'snack', 'dip', 'starter'],
-            'Soup': ['soup', 'stew', 'broth', 'chowder'],
-            'Salad': ['salad', 'slaw'],
-            'Main Course': ['chicken', 'beef', 'pork', 'fish', 'salmon', 'pasta', 'rice'],
-            'Vegetarian': ['tofu', 'vegetarian', 'vegan'],
-            'Side Dish': ['side', 'vegetable', 'potato', 'rice'],
-            'Bread': ['bread', 'roll', 'bun', 'muffin'],
-            'Beverage': ['drink', 'cocktail', 'smoothie', 'juice']
-        }
+        # One lowercase blob per field, so each keyword is a single substring search
+        # (no keyword contains a newline, so nothing can match across two lines)
+        ingredients = '\n'.join(recipe.get('ingredients', [])).lower()
+        text = recipe['title'].lower() + '\n' + ingredients
         
         # Check title and ingredients against patterns
-        for category, keywords in patterns.items():
-            if any(kw in title for kw in keywords):
-                return category
-            if any(any(kw in ing for kw in keywords) for ing in ingredients):
+        for category, keywords in CATEGORY_KEYWORDS:
+            if any(kw in text for kw in keywords):
                 return category
         
         # Special case for vegetarian
-        meat_ingredients = ['chicken', 'beef', 'pork', 'fish', 'salmon', 'lamb', 'turkey']
-        if not any(any(meat in ing for meat in meat_ingredients) for ing in ingredients):
+        if not any(meat in ingredients for meat in MEAT_INGREDIENTS):
             return 'Vegetarian'
         
         return 'Main Course'  # Default category
@@ -1104,29 +1041,31 @@ class RecipeConverter(QMainWindow):
         button.setFlat(True)
         button.setFixedSize(32, 32)
         
-        # Create an SVG icon with the current accent color
-        svg_data = {
-            'edit': '''
-                <svg viewBox="0 0 24 24" width="16" height="16">
-                    <path fill="#7ed957" d="M3 17.25V21h3.75L17.81 9.94l-3.75-3.75L3 17.25zM20.71 7.04c.39-.39.39-1.02 0-1.41l-2.34-2.34c-.39-.39-1.02-.39-1.41 0l-1.83 1.83 3.75 3.75 1.83-1.83z"/>
-                </svg>
-            ''',
-            'category': '''
-                <svg viewBox="0 0 24 24" width="16" height="16">
-                    <path fill="#7ed957" d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 10-10S17.52 2 12 2zm0 18c-4.41 0-8-3.59-8-8s3.59-8 8-8 8 3.59 8 8-3.59 8-8 8zm-1-11h2v3h3v2h-3v3h-2v-3H8v-2h3V9z"/>
-                </svg>
-            '''
-        }
-        
-        # Convert SVG to QIcon
-        svg_bytes = svg_data[icon_name].encode('utf-8')
-        pixmap = QPixmap()
-        pixmap.loadFromData(svg_bytes)
-        button.setIcon(QIcon(pixmap))
+        button.setIcon(self.edit_icons[icon_name])
         button.setToolTip("Edit Title" if icon_name == "edit" else "Edit Category")
         return button
 
     def add_recipe_to_list(self, recipe):
+        self.pending_recipes.append(recipe)
+        if not self.pending_timer.isActive():
+            self.pending_timer.start()
+
+    def flush_pending_recipes(self):
+        self.pending_timer.stop()
+        if not self.pending_recipes:
+            return
+        recipes, self.pending_recipes = self.pending_recipes, []
+        
+        # Lay the list out once for the whole batch
+        self.recipe_list_widget.setUpdatesEnabled(False)
+        try:
+            for recipe in recipes:
+                self.create_recipe_row(recipe)
+        finally:
+            self.recipe_list_widget.setUpdatesEnabled(True)
+        self.recipe_list_widget.updateGeometry()
+
+    def create_recipe_row(self, recipe):
         self.recipes.append(recipe)
         idx = len(self.recipes) - 1
         
@@ -1177,10 +1116,6 @@ class RecipeConverter(QMainWindow):
         # Add to layout
         self.recipe_list_layout.addWidget(row)
         self.recipe_rows.append(row)
-        
-        # Update UI
-        self.recipe_list_widget.updateGeometry()
-        QApplication.processEvents()
 
     def edit_recipe_title(self, row):
         old_title = self.recipe_edits[row.idx]['title']
@@ -1214,6 +1149,7 @@ class RecipeConverter(QMainWindow):
             row.cat_label.setText(new_cat)
 
     def extraction_finished(self, recipes):
+        self.flush_pending_recipes()
         self.extract_btn.setEnabled(True)
         if recipes:
             self.generate_btn.setEnabled(True)
@@ -1221,14 +1157,13 @@ class RecipeConverter(QMainWindow):
             self.save_links_to_md()
         else:
             self.status_label.setText("No recipes could be extracted")
-        QApplication.processEvents()
 
     def save_links_to_md(self):
         try:
             with open(self.md_file_path, 'w', encoding='utf-8') as f:
                 f.write(f"# Recipe Links - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
                 for recipe in self.recipes:
-                    f.write(f"- [{recipe['title']}]({recipe['url']})\n")
+                    f.write(markdown_link(recipe['title'], recipe['url']))
             self.status_label.setText(f"Saved {len(self.recipes)} links to {self.md_file_path}")
         except Exception as e:
             QMessageBox.warning(self, "Warning", f"Could not save links: {str(e)}")
@@ -1321,4 +1256,5 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Parse workers in frozen Windows builds
     main()
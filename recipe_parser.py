@@ -0,0 +1,455 @@
+# Recipe page parsing and fetch helpers shared by the GUI and the test tool, kept free of Qt
+# so they can be used and tested without the GUI
+import json
+import orjson
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from html import unescape
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer, UnicodeDammit
+import soupsieve
+from recipe_scrapers import scrape_html
+from recipe_scrapers._exceptions import WebsiteNotImplementedError
+
+# Only build the tags each parsing pass actually looks at
+JSON_LD_STRAINER = SoupStrainer('script', type=['application/ld+json', 'application/json'])
+PAGE_CONTENT_STRAINER = SoupStrainer(['title', 'body'])
+
+ISO8601_DURATION_RE = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?')
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x1F\x7F]')
+LD_JSON_RE = re.compile(r'<script[^>]*application/ld\+json[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+SCRAPER_STEP_SPLIT_RE = re.compile(r'\n+|\d+\.|^\d+\)', re.MULTILINE)
+STEP_SPLIT_RE = re.compile(r'\n+|\d+\.\s*|\d+\)\s*')
+
+# Selectors for the HTML fallback parser, tried in order
+TITLE_SELECTORS = ['h1', '.recipe-title', '.entry-title', 'title']
+
+INGREDIENT_SELECTORS = [
+    'ul.ingredients li', '.recipe-ingredients li', '.ingredients li',
+    '[itemprop="recipeIngredient"]', '.ingredient-list li',
+    '.wprm-recipe-ingredient', '.ingredient', '[class*="ingredient"]',
+    '.tasty-recipes-ingredients li', '.recipe-ingred_str', '.ERSIngredients li',
+    '.wpurp-recipe-ingredient', '[class*="ingredient-list"] li'
+]
+
+INGREDIENT_CONTAINER_SELECTORS = ['.ingredients', '.recipe-ingredients', '[itemprop="recipeIngredient"]']
+
+INSTRUCTION_SELECTORS = [
+    'ol.instructions li', '.recipe-instructions li', '.recipe-directions li',
+    '[itemprop="recipeInstructions"] li', '.instruction-list li',
+    '.wprm-recipe-instruction', '.preparation-step', '.recipe-method-step',
+    '.tasty-recipes-instructions li', '.ERSInstructions li', '.recipe-steps li',
+    '.wpurp-recipe-instruction', '[class*="instruction-list"] li'
+]
+
+INSTRUCTION_CONTAINER_SELECTORS = [
+    '.recipe-instructions', '.recipe-directions', '.instructions',
+    '[itemprop="recipeInstructions"]', '.method-steps', '.recipe-method',
+    '.wprm-recipe-instructions', '.tasty-recipes-instructions',
+    '.ERSInstructions', '.wpurp-recipe-instructions', '.recipe__method-steps',
+    '.RecipeInstructions', '[class*="recipe-steps"]', '[class*="cooking-steps"]',
+    '[class*="method-steps"]'
+]
+
+IMAGE_SELECTORS = [
+    '.recipe-image img', '.recipe-photo img', '[class*="recipe"] img',
+    'img[itemprop="image"]', '.hero-photo img'
+]
+
+# Compile each selector once instead of on every recipe
+TITLE_MATCHERS = [soupsieve.compile(s) for s in TITLE_SELECTORS]
+INGREDIENT_MATCHERS = [soupsieve.compile(s) for s in INGREDIENT_SELECTORS]
+INGREDIENT_CONTAINER_MATCHERS = [soupsieve.compile(s) for s in INGREDIENT_CONTAINER_SELECTORS]
+INSTRUCTION_MATCHERS = [soupsieve.compile(s) for s in INSTRUCTION_SELECTORS]
+INSTRUCTION_CONTAINER_MATCHERS = [soupsieve.compile(s) for s in INSTRUCTION_CONTAINER_SELECTORS]
+IMAGE_MATCHERS = [soupsieve.compile(s) for s in IMAGE_SELECTORS]
+# Unions let a single tree walk find every candidate for a field
+INGREDIENT_UNION = soupsieve.compile(', '.join(INGREDIENT_SELECTORS))
+INSTRUCTION_UNION = soupsieve.compile(', '.join(INSTRUCTION_SELECTORS))
+
+def select_first_texts(soup, union, matchers):
+    """Return (selector, element texts) for the first selector, in priority order, that matches any text"""
+    # One traversal collects every candidate; the individual selectors
+    # then only have to match against those elements
+    candidates = union.select(soup)
+    for matcher in matchers:
+        elements = [el for el in candidates if matcher.match(el)]
+        # get_text() walks the element's subtree, so call it once per element
+        texts = [t for t in (el.get_text().strip() for el in elements) if t]
+        if texts:
+            return matcher.pattern, texts
+    return None, []
+
+def select_texts(soup, union, matchers):
+    """Return the element texts of the first selector, in priority order, that matches any text"""
+    return select_first_texts(soup, union, matchers)[1]
+
+def is_recipe(obj):
+    """Check whether a JSON-LD node is typed as a Recipe (including 'schema:Recipe' style types)"""
+    return isinstance(obj, dict) and 'Recipe' in str(obj.get('@type', ''))
+
+def find_recipe_node(data):
+    """Find the first Recipe node in decoded JSON-LD, in document order"""
+    # Depth-first search with an explicit stack; children are pushed in
+    # reverse so they are visited in document order
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            if is_recipe(obj):
+                return obj
+            stack.extend(reversed(list(obj.values())))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+    return None
+
+def unescape_text(value):
+    """Decode HTML entities in a JSON-LD string, leaving anything else untouched"""
+    return unescape(value) if isinstance(value, str) else value
+
+def decode_html(body, encoding=None):
+    """Decode a page body with its header charset if that names a real codec, else sniff <meta charset> and the bytes"""
+    if encoding:
+        try:
+            return body.decode(encoding, errors='replace')
+        except LookupError:
+            pass
+    markup = UnicodeDammit(body, is_html=True).unicode_markup
+    # Most recipe sites are UTF-8 when nothing else can be worked out
+    return markup if markup is not None else body.decode('utf-8', errors='replace')
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+
+def make_soup(markup, parse_only=None):
+    """Parse HTML with lxml, falling back to the pure-Python parser if lxml is missing"""
+    try:
+        return BeautifulSoup(markup, 'lxml', parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(markup, 'html.parser', parse_only=parse_only)
+
+class RecipeParser:
+    """Turns a downloaded recipe page into a recipe dict; free of Qt so it can run in worker processes"""
+
+    def parse_custom(self, url, html):
+        # Our own parser, for sites recipe-scrapers can't handle
+        print("Trying custom parser...")
+        try:
+            print("Looking for JSON-LD recipe data...")
+            # Pull ld+json blocks straight out of the markup, most pages never need a DOM
+            recipe_data = self.find_json_ld_recipe(LD_JSON_RE.findall(html))
+            if not recipe_data:
+                # Fall back to a real parse of the scripts for markup the regex can't handle
+                script_soup = make_soup(html, JSON_LD_STRAINER)
+                json_scripts = script_soup.find_all('script', type='application/ld+json') + script_soup.find_all('script', type='application/json')
+                print(f"Found {len(json_scripts)} JSON-LD scripts")
+                recipe_data = self.find_json_ld_recipe(script.string for script in json_scripts)
+            
+            if recipe_data:
+                return self.parse_structured_recipe(recipe_data, url)
+            else:
+                # Skip <head> metadata and styles, the selectors only need the title and page body
+                return self.parse_html_recipe(make_soup(html, PAGE_CONTENT_STRAINER), url)
+        except Exception as e:
+            raise Exception(f"Failed to extract recipe: {str(e)}")
+
+    def try_recipe_scrapers(self, url, html):
+        try:
+            print("Attempting recipe-scrapers...")
+            # Hand recipe-scrapers the page we already downloaded
+            scraper = scrape_html(html, org_url=url)
+            recipe_data = {
+                'url': url,
+                'title': scraper.title(),
+                'description': '',
+                'prep_time': '',
+                'cook_time': '',
+                'total_time': '',
+                'servings': '',
+                'ingredients': [],
+                'instructions': [],
+                'image_url': None
+            }
+            
+            try: recipe_data['description'] = scraper.description()
+            except: pass
+            try: recipe_data['prep_time'] = str(scraper.prep_time())
+            except: pass
+            try: recipe_data['cook_time'] = str(scraper.cook_time())
+            except: pass
+            try: recipe_data['total_time'] = str(scraper.total_time())
+            except: pass
+            try: recipe_data['servings'] = str(scraper.yields())
+            except: pass
+            try:
+                ingredients = scraper.ingredients()
+                print(f"Found {len(ingredients)} ingredients")
+                recipe_data['ingredients'] = ingredients
+            except Exception as e:
+                print(f"Failed to get ingredients: {str(e)}")
+                pass
+            try: 
+                print("Trying to get instructions...")
+                if hasattr(scraper, 'instructions_list'):
+                    instructions = scraper.instructions_list()
+                    print(f"Found {len(instructions)} instructions from list")
+                    recipe_data['instructions'] = instructions
+                else:
+                    instructions = scraper.instructions()
+                    print(f"Got instructions string: {instructions[:100]}...")
+                    if isinstance(instructions, str):
+                        # Split by newlines or numbers at start of line
+                        steps = [s.strip() for s in SCRAPER_STEP_SPLIT_RE.split(instructions)]
+                        recipe_data['instructions'] = [s for s in steps if s]
+                        print(f"Split into {len(recipe_data['instructions'])} steps")
+                    else:
+                        recipe_data['instructions'] = instructions
+                        print(f"Using instructions as-is, type: {type(instructions)}")
+            except Exception as e:
+                print(f"Failed to get instructions: {str(e)}")
+                pass
+            try: recipe_data['image_url'] = scraper.image()
+            except: pass
+
+            # If we got the crucial data, return it
+            if recipe_data['title'] and (recipe_data['ingredients'] or recipe_data['instructions']):
+                return recipe_data
+
+        except WebsiteNotImplementedError:
+            raise  # The caller decides what to do about unsupported sites
+        except Exception as e:
+            print(f"Recipe-scraper failed: {str(e)}")
+        return None
+
+    def find_json_ld_recipe(self, scripts):
+        """Return the first Recipe object found in a sequence of JSON-LD script texts"""
+        for script_text in scripts:
+            try:
+                script_text = script_text or ''
+                # Organization, BreadcrumbList etc. blocks can't hold a recipe, don't bother decoding them
+                if 'Recipe' not in script_text:
+                    continue
+                # Clean the JSON string - some sites have invalid characters
+                json_str = CONTROL_CHARS_RE.sub('', script_text)
+                data = orjson.loads(json_str)
+                
+                # Handles top-level objects, arrays and nested @graph structures alike
+                recipe_data = find_recipe_node(data)
+                if recipe_data:
+                    return recipe_data
+            except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
+                continue
+            except Exception as e:
+                print(f"Error parsing JSON-LD: {str(e)}")
+        return None
+
+    def parse_structured_recipe(self, data, url):
+        recipe = {
+            'url': url,
+            'title': 'Untitled Recipe',
+            'description': '',
+            'prep_time': '',
+            'cook_time': '',
+            'total_time': '',
+            'servings': '',
+            'ingredients': [],
+            'instructions': [],
+            'image_url': None
+        }
+        
+        # Basic recipe metadata
+        recipe['title'] = data.get('name', data.get('headline', 'Untitled Recipe'))
+        recipe['description'] = data.get('description', '')
+        recipe['servings'] = str(data.get('recipeYield', data.get('yield', '')))
+        
+        # Time information
+        recipe['prep_time'] = self.extract_time(data.get('prepTime', ''))
+        recipe['cook_time'] = self.extract_time(data.get('cookTime', ''))
+        recipe['total_time'] = self.extract_time(data.get('totalTime', ''))
+        
+        # Handle ingredients - multiple possible property names
+        raw_ingredients = []
+        for key in ['recipeIngredient', 'ingredients', 'recipeIngredients']:
+            if key in data:
+                raw_ingredients = data[key]
+                break
+        
+        if isinstance(raw_ingredients, str):
+            # Split by newlines if it's a single string
+            raw_ingredients = [ing.strip() for ing in raw_ingredients.split('\n')]
+        elif isinstance(raw_ingredients, dict):
+            # Some sites nest ingredients in an object
+            raw_ingredients = [str(ing) for ing in raw_ingredients.values()]
+            
+        recipe['ingredients'] = [ing.strip() for ing in raw_ingredients if ing and ing.strip()]
+        
+        # Handle instructions - multiple possible formats
+        raw_instructions = data.get('recipeInstructions', data.get('instructions', []))
+        instructions = []
+        
+        if isinstance(raw_instructions, str):
+            # Split by newlines or numbers if it's a single string
+            steps = STEP_SPLIT_RE.split(raw_instructions)
+            instructions = [step.strip() for step in steps if step.strip()]
+        else:
+            # Walk HowToStep/HowToSection trees with an explicit stack; items are
+            # pushed in reverse so steps come out in document order
+            if isinstance(raw_instructions, dict):
+                # A lone HowToSection rather than a list of steps
+                raw_instructions = [raw_instructions]
+            stack = list(reversed(raw_instructions)) if isinstance(raw_instructions, list) else []
+            while stack:
+                inst = stack.pop()
+                text = None
+                if isinstance(inst, dict):
+                    # HowToStep format
+                    if 'text' in inst:
+                        text = inst['text']
+                    # HowToSection format
+                    elif 'itemListElement' in inst:
+                        items = inst['itemListElement']
+                        if isinstance(items, list):
+                            stack.extend(reversed(items))
+                        if isinstance(inst.get('name'), str):
+                            text = f"== {inst['name']} =="
+                    # Some sites use 'step' instead of 'text'
+                    elif 'step' in inst:
+                        text = inst['step']
+                elif isinstance(inst, str):
+                    text = inst
+                if isinstance(text, str) and text.strip():
+                    instructions.append(text.strip())
+        
+        recipe['instructions'] = instructions
+        
+        # JSON-LD text often arrives entity-encoded (&amp;, &#39;), decode it once so the
+        # EPUB writer's escaping doesn't turn it into a literal "&amp;"
+        recipe['title'] = unescape_text(recipe['title'])
+        recipe['description'] = unescape_text(recipe['description'])
+        recipe['ingredients'] = [unescape_text(ing) for ing in recipe['ingredients']]
+        recipe['instructions'] = [unescape_text(step) for step in recipe['instructions']]
+        
+        # Extract image - handle multiple formats
+        image = data.get('image', data.get('images', data.get('thumbnailUrl')))
+        if image:
+            if isinstance(image, list):
+                # Get the first image
+                image = image[0]
+            if isinstance(image, dict):
+                # Prefer full-size image if available
+                recipe['image_url'] = image.get('url', image.get('contentUrl'))
+            elif isinstance(image, str):
+                recipe['image_url'] = image
+        
+        return recipe
+
+    def parse_html_recipe(self, soup, url):
+        recipe = {
+            'url': url,
+            'title': 'Untitled Recipe',
+            'description': '',
+            'prep_time': '',
+            'cook_time': '',
+            'total_time': '',
+            'servings': '',
+            'ingredients': [],
+            'instructions': [],
+            'image_url': None
+        }
+        
+        # Try to find title
+        for matcher in TITLE_MATCHERS:
+            title_elem = matcher.select_one(soup)
+            if title_elem:
+                recipe['title'] = title_elem.get_text().strip()
+                break
+        
+        # Try to find ingredients
+        recipe['ingredients'] = select_texts(soup, INGREDIENT_UNION, INGREDIENT_MATCHERS)
+        
+        # If no ingredients found, try finding a container and get text or lists within
+        if not recipe['ingredients']:
+            for matcher in INGREDIENT_CONTAINER_MATCHERS:
+                container = matcher.select_one(soup)
+                if container:
+                    # Try to find lists within container
+                    lists = container.find_all(['ul', 'ol'])
+                    if lists:
+                        for list_elem in lists:
+                            items = list_elem.find_all('li')
+                            if items:
+                                recipe['ingredients'].extend([item.get_text().strip() for item in items if item.get_text().strip()])
+                    # If no lists found, try to split text by newlines
+                    elif container.get_text().strip():
+                        text = container.get_text().strip()
+                        items = [line.strip() for line in text.split('\n') if line.strip()]
+                        recipe['ingredients'].extend(items)
+                    if recipe['ingredients']:
+                        break
+        
+        # Try to find instructions
+        recipe['instructions'] = select_texts(soup, INSTRUCTION_UNION, INSTRUCTION_MATCHERS)
+        
+        # If no structured instructions found, try finding paragraphs within instruction containers
+        if not recipe['instructions']:
+            for matcher in INSTRUCTION_CONTAINER_MATCHERS:
+                container = matcher.select_one(soup)
+                if container:
+                    paragraphs = container.find_all(['p', 'li'])
+                    if paragraphs:
+                        recipe['instructions'] = [p.get_text().strip() for p in paragraphs if p.get_text().strip()]
+                        break
+        
+        # Try to find image
+        for matcher in IMAGE_MATCHERS:
+            img = matcher.select_one(soup)
+            if img and img.get('src'):
+                recipe['image_url'] = urljoin(url, img['src'])
+                break
+        
+        return recipe
+
+    def extract_time(self, time_str):
+        if not time_str:
+            return ''
+        # Already human readable ("30 min") or not a string at all
+        if not isinstance(time_str, str):
+            return str(time_str)
+        if not time_str.startswith('PT'):
+            return time_str
+        # Handle ISO 8601 duration format (PT30M); both parts are optional, so this always matches
+        match = ISO8601_DURATION_RE.match(time_str)
+        hours = int(match.group(1) or 0)
+        minutes = int(match.group(2) or 0)
+        if hours and minutes:
+            return f"{hours}h {minutes}m"
+        elif hours:
+            return f"{hours}h"
+        elif minutes:
+            return f"{minutes}m"
+        return time_str
+
+def parse_recipe_page(url, html, try_scrapers=True):
+    """Parse one page in a worker process, returning (recipe, whether recipe-scrapers supports the site)"""
+    parser = RecipeParser()
+    if try_scrapers:
+        try:
+            recipe = parser.try_recipe_scrapers(url, html)
+            if recipe:
+                return recipe, True
+        except WebsiteNotImplementedError:
+            print(f"recipe-scrapers doesn't support {urlparse(url).netloc}")
+            return parser.parse_custom(url, html), False
+    return parser.parse_custom(url, html), try_scrapers
@@ -0,0 +1,54 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from ebooklib import epub
+
+from recipe_epub_converter import ImageStoringEpubWriter
+
+
+class ImageStoringEpubWriterTest(unittest.TestCase):
+    def write_book(self, path):
+        book = epub.EpubBook()
+        book.set_identifier('test-book')
+        book.set_title('Test Book')
+        book.set_language('en')
+
+        chapter = epub.EpubHtml(title='Soup', file_name='chapter_0.xhtml',
+                                content='<h1>Soup</h1>' + '<p>Stir the pot.</p>' * 50 +
+                                        '<img src="images/soup.jpg" alt="Soup"/>')
+        book.add_item(chapter)
+        book.add_item(epub.EpubImage(uid='soup', file_name='images/soup.jpg',
+                                     media_type='image/jpeg', content=b'\xff\xd8\xff\xe0' + b'\x00' * 4096))
+        book.add_item(epub.EpubImage(uid='logo', file_name='images/logo.PNG',
+                                     media_type='image/png', content=b'\x89PNG\r\n\x1a\n' + b'\x00' * 4096))
+        book.toc = [epub.Link('chapter_0.xhtml', 'Soup', 'chapter_0')]
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+        book.spine = [chapter]
+
+        writer = ImageStoringEpubWriter(str(path), book, {'compresslevel': 1})
+        writer.process()
+        writer.write()
+
+    def test_images_are_stored_and_text_is_deflated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'book.epub'
+            self.write_book(path)
+            with zipfile.ZipFile(path) as archive:
+                entries = archive.infolist()
+                compression = {info.filename: info.compress_type for info in entries}
+
+                self.assertEqual(entries[0].filename, 'mimetype')
+                self.assertEqual(entries[0].compress_type, zipfile.ZIP_STORED)
+                self.assertEqual(archive.read('mimetype'), b'application/epub+zip')
+
+                self.assertEqual(compression['EPUB/images/soup.jpg'], zipfile.ZIP_STORED)
+                self.assertEqual(compression['EPUB/images/logo.PNG'], zipfile.ZIP_STORED)
+                self.assertEqual(compression['EPUB/chapter_0.xhtml'], zipfile.ZIP_DEFLATED)
+                self.assertIsNone(archive.testzip())
+
+
+if __name__ == '__main__':
+    unittest.main()
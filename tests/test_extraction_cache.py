@@ -0,0 +1,83 @@
+import gzip
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from TestExtraction import test_extraction
+from TestExtraction.test_extraction import ExtractionCache, RecipeExtractor, create_cache, parse_args
+
+URL = 'https://example.com/recipe'
+PAGE = b'<html><head><title>Soup</title></head><body><h1>Soup</h1></body></html>'
+
+
+class ExtractionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = Path(self.tmp.name) / 'cache'
+        self.cache = ExtractionCache(self.cache_dir, max_age_days=1)
+
+    def test_round_trip(self):
+        self.cache.put_html(URL, PAGE)
+        self.assertEqual(self.cache.get_html(URL), PAGE)
+        self.cache.put_recipe(PAGE, {'title': 'Soup'})
+        self.assertEqual(self.cache.get_recipe(PAGE), {'title': 'Soup'})
+
+    def test_stale_page_expires(self):
+        self.cache.put_html(URL, PAGE)
+        two_days_ago = time.time() - 2 * 24 * 60 * 60
+        os.utime(self.cache._html_path(URL), (two_days_ago, two_days_ago))
+        self.assertFalse(self.cache.has_html(URL))
+        self.assertIsNone(self.cache.get_html(URL))
+
+    def test_corrupt_and_truncated_entries_are_ignored(self):
+        self.cache._html_path(URL).write_bytes(b'not gzip at all')
+        self.assertIsNone(self.cache.get_html(URL))
+        self.cache._html_path(URL).write_bytes(gzip.compress(PAGE)[:-8])
+        self.assertIsNone(self.cache.get_html(URL))
+
+    def test_write_goes_through_a_temporary_file(self):
+        with mock.patch.object(test_extraction.os, 'replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.cache.put_html(URL, PAGE)
+        # The real entry is only ever created by the final rename
+        self.assertFalse(self.cache._html_path(URL).exists())
+
+        self.assertEqual(list(self.cache_dir.glob('*.tmp')), [])
+
+        self.cache.put_html(URL, PAGE)
+        self.assertEqual(self.cache.get_html(URL), PAGE)
+        self.assertEqual(list(self.cache_dir.glob('*.tmp')), [])
+
+    def test_corrupt_entry_falls_back_to_the_network(self):
+        self.cache._html_path(URL).write_bytes(b'not gzip at all')
+        response = mock.MagicMock()
+        response.status_code = 200
+        response.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        response.encoding = 'utf-8'
+        response.iter_content.return_value = [PAGE]
+
+        extractor = RecipeExtractor(self.cache)
+        extractor.throttle = test_extraction.HostThrottle(0)
+        extractor.session = mock.Mock()
+        extractor.session.get.return_value = response
+
+        results, body = extractor.fetch(URL)
+        self.assertEqual(body, PAGE)
+        self.assertFalse(results['cache']['html'])
+        extractor.session.get.assert_called_once()
+        # The bad entry was replaced by the fresh page
+        self.assertEqual(self.cache.get_html(URL), PAGE)
+
+    def test_no_cache_flag(self):
+        cache_dir = Path(self.tmp.name) / 'unused'
+        self.assertIsNone(create_cache(parse_args(['--no-cache', '--cache-dir', str(cache_dir)])))
+        self.assertFalse(cache_dir.exists())
+        self.assertIsInstance(create_cache(parse_args(['--cache-dir', str(cache_dir)])), ExtractionCache)
+
+
+if __name__ == '__main__':
+    unittest.main()
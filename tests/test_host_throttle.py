@@ -0,0 +1,106 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+from recipe_parser import parse_retry_after
+from TestExtraction import test_extraction
+from TestExtraction.test_extraction import MAX_RETRY_AFTER, HostThrottle, RecipeExtractor
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after(' 7 '), 7.0)
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        self.assertAlmostEqual(parse_retry_after(format_datetime(retry_at, usegmt=True)), 30, delta=2)
+
+    def test_http_date_in_the_past(self):
+        retry_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        self.assertEqual(parse_retry_after(format_datetime(retry_at, usegmt=True)), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(''))
+        self.assertIsNone(parse_retry_after('soon'))
+
+
+class HostThrottleTest(unittest.TestCase):
+    def test_slots_are_reserved_across_threads(self):
+        throttle = HostThrottle(0.05)
+        started = []
+        lock = threading.Lock()
+
+        def request():
+            throttle.wait('https://example.com/recipe')
+            with lock:
+                started.append(time.monotonic())
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        started.sort()
+        gaps = [later - earlier for earlier, later in zip(started, started[1:])]
+        self.assertEqual(len(gaps), 3)
+        for gap in gaps:
+            self.assertGreaterEqual(gap, 0.04)
+
+    def test_other_hosts_are_not_delayed(self):
+        throttle = HostThrottle(10)
+        throttle.wait('https://example.com/a')
+        before = time.monotonic()
+        throttle.wait('https://example.org/b')
+        self.assertLess(time.monotonic() - before, 1)
+
+    def test_back_off_honours_short_retry_after(self):
+        throttle = HostThrottle(1)
+        self.assertTrue(throttle.back_off('https://example.com/a', '5'))
+        self.assertAlmostEqual(throttle._next_ok['example.com'] - time.monotonic(), 5, delta=0.5)
+
+    def test_back_off_caps_long_retry_after(self):
+        throttle = HostThrottle(1)
+        self.assertFalse(throttle.back_off('https://example.com/a', '86400'))
+        self.assertLessEqual(throttle._next_ok['example.com'] - time.monotonic(), MAX_RETRY_AFTER)
+
+
+class RateLimitedFetchTest(unittest.TestCase):
+    def make_response(self, status_code, headers=None):
+        response = mock.MagicMock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        response.encoding = 'utf-8'
+        return response
+
+    def make_extractor(self, responses):
+        extractor = RecipeExtractor()
+        extractor.throttle = HostThrottle(0)
+        extractor.session = mock.Mock()
+        extractor.session.get.side_effect = responses
+        return extractor
+
+    def test_long_retry_after_is_recorded_without_retrying(self):
+        extractor = self.make_extractor([self.make_response(429, {'Retry-After': '86400'})])
+        results, body = extractor.fetch('https://example.com/recipe')
+        self.assertIsNone(body)
+        self.assertIn("Rate limited (HTTP 429)", results['errors'])
+        self.assertEqual(extractor.session.get.call_count, 1)
+
+    def test_gives_up_after_the_retry_limit(self):
+        responses = [self.make_response(429, {'Retry-After': '0'})
+                     for _ in range(test_extraction.RATE_LIMIT_RETRIES + 1)]
+        extractor = self.make_extractor(responses)
+        results, body = extractor.fetch('https://example.com/recipe')
+        self.assertIsNone(body)
+        self.assertIn("Rate limited (HTTP 429)", results['errors'])
+        self.assertEqual(extractor.session.get.call_count, test_extraction.RATE_LIMIT_RETRIES + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
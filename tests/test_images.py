@@ -0,0 +1,127 @@
+import unittest
+from io import BytesIO
+from unittest import mock
+
+import httpx
+from PIL import Image, features
+
+import recipe_epub_converter
+from recipe_epub_converter import (IMAGE_RETRY_BACKOFF, MAX_IMAGE_BYTES, MAX_IMAGE_DIMENSION,
+                                   EpubGenerator, image_media_type, shrink_image)
+
+
+def encode(img, format):
+    with BytesIO() as output:
+        img.save(output, format=format)
+        return output.getvalue()
+
+
+def decode(data):
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
+
+
+class ShrinkImageTest(unittest.TestCase):
+    def test_small_reader_friendly_images_are_kept(self):
+        self.assertIsNone(shrink_image(encode(Image.new('RGB', (200, 100), 'red'), 'JPEG')))
+        self.assertIsNone(shrink_image(encode(Image.new('RGBA', (200, 100), (255, 0, 0, 0)), 'PNG')))
+
+    def test_large_photo_is_downscaled(self):
+        img = decode(shrink_image(encode(Image.new('RGB', (2400, 1600), 'red'), 'JPEG')))
+        self.assertEqual(img.format, 'JPEG')
+        self.assertEqual(img.size, (MAX_IMAGE_DIMENSION, 800))
+
+    def test_transparency_is_flattened_onto_white(self):
+        img = decode(shrink_image(encode(Image.new('RGBA', (2000, 100), (255, 0, 0, 0)), 'PNG')))
+        self.assertEqual(img.format, 'JPEG')
+        self.assertEqual(img.mode, 'RGB')
+        self.assertEqual(max(img.size), MAX_IMAGE_DIMENSION)
+        for channel in img.getpixel((img.width // 2, img.height // 2)):
+            self.assertGreater(channel, 245)
+
+    @unittest.skipUnless(features.check('webp'), "Pillow built without WebP support")
+    def test_small_webp_is_reencoded_as_jpeg(self):
+        img = decode(shrink_image(encode(Image.new('RGB', (200, 100), 'blue'), 'WEBP')))
+        self.assertEqual(img.format, 'JPEG')
+        self.assertEqual(img.size, (200, 100))
+
+
+class ImageMediaTypeTest(unittest.TestCase):
+    def test_content_type_is_trusted_when_it_is_an_image(self):
+        self.assertEqual(image_media_type(b'', 'image/PNG; charset=binary'), 'image/png')
+
+    def test_signature_fallback(self):
+        png = encode(Image.new('RGB', (4, 4)), 'PNG')
+        gif = encode(Image.new('P', (4, 4)), 'GIF')
+        self.assertEqual(image_media_type(png, 'application/octet-stream'), 'image/png')
+        self.assertEqual(image_media_type(gif, ''), 'image/gif')
+        self.assertEqual(image_media_type(b'\xff\xd8\xff\xe0rest', 'text/html'), 'image/jpeg')
+        self.assertEqual(image_media_type(b'RIFF\x00\x00\x00\x00WEBPVP8 ', 'binary/octet-stream'), 'image/webp')
+        self.assertEqual(image_media_type(b'unknown', ''), 'image/jpeg')
+
+
+class DownloadImageTest(unittest.TestCase):
+    URL = 'https://cdn.example.com/soup.png'
+
+    def make_generator(self, responses):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return responses.pop(0)
+
+        generator = EpubGenerator({}, 'unused.epub')
+        generator.session = httpx.Client(transport=httpx.MockTransport(handler))
+        self.addCleanup(generator.session.close)
+        return generator, requests
+
+    def test_retries_rate_limits_and_server_errors(self):
+        png = encode(Image.new('RGB', (8, 8), 'green'), 'PNG')
+        generator, requests = self.make_generator([
+            httpx.Response(429, headers={'Retry-After': '1'}),
+            httpx.Response(503),
+            httpx.Response(200, headers={'Content-Type': 'image/png'}, content=png),
+        ])
+        with mock.patch.object(recipe_epub_converter.time, 'sleep') as sleep:
+            self.assertEqual(generator.download_image(self.URL), (png, 'image/png'))
+        self.assertEqual(len(requests), 3)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1.0, IMAGE_RETRY_BACKOFF * 2])
+
+    def test_long_retry_after_gives_up(self):
+        generator, requests = self.make_generator([httpx.Response(429, headers={'Retry-After': '3600'})])
+        with mock.patch.object(recipe_epub_converter.time, 'sleep') as sleep:
+            self.assertIsNone(generator.download_image(self.URL))
+        self.assertEqual(len(requests), 1)
+        sleep.assert_not_called()
+
+    def test_gives_up_after_the_retry_limit(self):
+        generator, requests = self.make_generator([httpx.Response(503) for _ in range(3)])
+        with mock.patch.object(recipe_epub_converter.time, 'sleep'):
+            self.assertIsNone(generator.download_image(self.URL))
+        self.assertEqual(len(requests), 3)
+
+    def test_oversized_download_is_abandoned_while_streaming(self):
+        chunk = b'\x00' * (1024 * 1024)
+        sent = []
+
+        def body():
+            # No Content-Length, so only the running total can catch it
+            for _ in range(2 * MAX_IMAGE_BYTES // len(chunk)):
+                sent.append(len(chunk))
+                yield chunk
+
+        generator, _ = self.make_generator([httpx.Response(200, headers={'Content-Type': 'image/jpeg'},
+                                                           content=body())])
+        self.assertIsNone(generator.download_image(self.URL))
+        self.assertLessEqual(sum(sent), MAX_IMAGE_BYTES + len(chunk))
+
+    def test_oversized_content_length_is_rejected_before_reading(self):
+        generator, _ = self.make_generator([httpx.Response(
+            200, headers={'Content-Type': 'image/jpeg', 'Content-Length': str(MAX_IMAGE_BYTES + 1)},
+            content=iter([b'\xff\xd8\xff']))])
+        self.assertIsNone(generator.download_image(self.URL))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from recipe_epub_converter import MARKDOWN_LINK_RE, markdown_link
+
+
+class RecipeLinksTest(unittest.TestCase):
+    def read_back(self, text):
+        return [url.decode('utf-8') for url in MARKDOWN_LINK_RE.findall(text.encode('utf-8'))]
+
+    def test_saved_links_round_trip(self):
+        text = "# Recipe Links - 2024-01-01 12:00:00\n\n" + ''.join([
+            markdown_link('Pancakes [Gluten Free]', 'https://example.com/pancakes'),
+            markdown_link('Plain Soup', 'https://example.com/soup?serves=4'),
+        ])
+        self.assertEqual(self.read_back(text),
+                         ['https://example.com/pancakes', 'https://example.com/soup?serves=4'])
+
+    def test_urls_with_parentheses(self):
+        text = ''.join([
+            markdown_link('Pie', 'https://en.wikipedia.org/wiki/Pie_(food)'),
+            markdown_link('Photo', 'https://example.com/images/cake(1).jpg'),
+        ])
+        self.assertEqual(self.read_back(text),
+                         ['https://en.wikipedia.org/wiki/Pie_(food)', 'https://example.com/images/cake(1).jpg'])
+
+    def test_title_with_newline_stays_on_one_line(self):
+        line = markdown_link('Chocolate\nCake ', 'https://example.com/cake')
+        self.assertEqual(line, '- [Chocolate Cake](https://example.com/cake)\n')
+        self.assertEqual(self.read_back(line), ['https://example.com/cake'])
+
+    def test_windows_line_endings(self):
+        text = markdown_link('Stew', 'https://example.com/stew').replace('\n', '\r\n')
+        self.assertEqual(self.read_back(text), ['https://example.com/stew'])
+
+
+if __name__ == '__main__':
+    unittest.main()
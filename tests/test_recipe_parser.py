@@ -0,0 +1,53 @@
+import unittest
+from html import escape
+
+from recipe_parser import (INGREDIENT_MATCHERS, INGREDIENT_UNION, INSTRUCTION_MATCHERS, INSTRUCTION_UNION,
+                           RecipeParser, make_soup, select_first_texts, select_texts)
+
+
+class ParseStructuredRecipeTest(unittest.TestCase):
+    def test_entities_are_decoded_once(self):
+        data = {
+            '@type': 'Recipe',
+            'name': 'Mac &amp; Cheese',
+            'recipeIngredient': ['1 cup macaroni &amp; cheese', 'Grandma&#39;s sauce'],
+            'recipeInstructions': [{'@type': 'HowToStep', 'text': 'Boil &amp; drain'}]
+        }
+        recipe = RecipeParser().parse_structured_recipe(data, 'https://example.com/mac')
+
+        self.assertEqual(recipe['title'], 'Mac & Cheese')
+        self.assertEqual(recipe['ingredients'], ['1 cup macaroni & cheese', "Grandma's sauce"])
+        self.assertEqual(recipe['instructions'], ['Boil & drain'])
+        # The chapter writer escapes once, so the book shows '&' rather than a literal '&amp;'
+        self.assertEqual(escape(recipe['title']), 'Mac &amp; Cheese')
+
+
+class SelectTextsTest(unittest.TestCase):
+    def test_selector_priority_beats_document_order(self):
+        soup = make_soup(
+            '<div class="ingredient-notes">Use fresh eggs where you can</div>'
+            '<ul class="wprm-recipe-ingredients">'
+            '<li class="wprm-recipe-ingredient">2 eggs</li>'
+            '<li class="wprm-recipe-ingredient">1 cup flour</li>'
+            '</ul>'
+        )
+        self.assertEqual(select_first_texts(soup, INGREDIENT_UNION, INGREDIENT_MATCHERS),
+                         ('.wprm-recipe-ingredient', ['2 eggs', '1 cup flour']))
+
+    def test_selectors_matching_only_empty_elements_are_skipped(self):
+        soup = make_soup(
+            '<ol class="instructions"><li> </li><li><img src="step.jpg"/></li></ol>'
+            '<div class="preparation-step">Whisk the eggs</div>'
+            '<div class="preparation-step">Fold in the flour</div>'
+        )
+        self.assertEqual(select_first_texts(soup, INSTRUCTION_UNION, INSTRUCTION_MATCHERS),
+                         ('.preparation-step', ['Whisk the eggs', 'Fold in the flour']))
+
+    def test_no_match(self):
+        soup = make_soup('<p>Just a story about soup</p>')
+        self.assertEqual(select_first_texts(soup, INSTRUCTION_UNION, INSTRUCTION_MATCHERS), (None, []))
+        self.assertEqual(select_texts(soup, INGREDIENT_UNION, INGREDIENT_MATCHERS), [])
+
+
+if __name__ == '__main__':
+    unittest.main()